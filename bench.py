@@ -0,0 +1,376 @@
+import gc
+import time
+
+import config
+import display
+import effects
+import frame
+import https
+import keys
+import layout
+import power
+import telemetry
+from store import DEFAULT_SETTINGS
+
+# ---------------------------------------------------------------------------
+# Render Benchmarks
+# Each benchmark returns (unit, count, total_us) plus an optional note.
+# run() prints the average cost per unit and the resulting rate.
+# Benchmarks draw on the real matrix unless noted.
+# ---------------------------------------------------------------------------
+
+BENCH_TEXT = "The speed of light is approximately 299,792 km/s"
+COLOR_BENCH_TEXT = "The {red}speed of light{} is approximately {yellow}299,792{} km/s"
+
+# Chained 32x8 panel counts for the multi-panel benchmark
+PANEL_COUNTS = (1, 2, 4, 8)
+
+# Single 32-column panel heights for the tall-matrix benchmark
+TALL_HEIGHTS = (16, 32)
+
+# Resumed handshakes timed after the full one by the TLS benchmark
+TLS_RESUMES = 3
+
+# Rounds of down, down, up, right in the menu benchmark (10 visits every screen)
+MENU_ROUNDS = 10
+
+# WS2812B data rate: 24 bits at 800 kHz = 30 us per LED
+WS2812_US_PER_LED = 30
+
+
+class AllocError(Exception):
+    """A benchmark found heap allocation on a path that must not allocate."""
+
+
+class _NullStrip:
+    """Pixel buffer of any length that is never sent to LEDs."""
+
+    ORDER = (1, 0, 2, 3)
+
+    def __init__(self, num_leds):
+        self.n = num_leds
+        self.buf = bytearray(num_leds * 3)
+
+    def write(self):
+        pass
+
+
+def _bench_text_to_columns():
+    n = 20
+    start = time.ticks_us()
+    for _ in range(n):
+        display.text_to_columns(BENCH_TEXT)
+    return "fact", n, time.ticks_diff(time.ticks_us(), start)
+
+
+def _bench_render_frame(text=BENCH_TEXT):
+    columns = display.text_to_columns(text)
+    color = display.COLOR
+    frames = 0
+    start = time.ticks_us()
+    for offset in range(-config.MATRIX_WIDTH, len(columns)):
+        display.render_frame(columns, offset, color)
+        frames += 1
+    return "frame", frames, time.ticks_diff(time.ticks_us(), start)
+
+
+def _bench_render_color():
+    """render_frame with color spans (should match render_frame)."""
+    return _bench_render_frame(COLOR_BENCH_TEXT)
+
+
+def _chars_per_s(chars, columns):
+    """Steady scroll rate in characters/s at the current scroll delay, to one decimal."""
+    tenths = chars * 10000 // (columns * display.scroll_delay)
+    return str(tenths // 10) + "." + str(tenths % 10)
+
+
+def _bench_font_width():
+    """Proportional layout cost, and scroll rate in characters/s against fixed width."""
+    chars = len(BENCH_TEXT)
+    was = display.set_proportional(False)
+    fixed = len(display.text_to_columns(BENCH_TEXT))
+    display.set_proportional(True)
+    try:
+        start = time.ticks_us()
+        for _ in range(10):
+            columns = display.text_to_columns(BENCH_TEXT)
+        total = time.ticks_diff(time.ticks_us(), start)
+    finally:
+        display.set_proportional(was)
+    proportional = len(columns)
+    note = ("fixed " + str(fixed) + " columns, " + _chars_per_s(chars, fixed)
+            + " chars/s; proportional " + str(proportional) + " columns, "
+            + _chars_per_s(chars, proportional) + " chars/s at "
+            + str(display.scroll_delay) + " ms")
+    return "layout", 10, total, note
+
+
+def _bench_dither():
+    """Dither redraw cost (all columns + LED write) and the redraw rate it sustains."""
+    columns = display.text_to_columns(BENCH_TEXT)
+    was = display.set_dither(True)
+    try:
+        display.render_frame(columns, 0, display.COLOR)
+        for _ in range(display.DITHER_PHASES):
+            display.dither_frame()  # warm up the pattern caches of every phase
+        frames = 50
+        start = time.ticks_us()
+        for _ in range(frames):
+            display.dither_frame()
+        total = time.ticks_diff(time.ticks_us(), start)
+    finally:
+        display.set_dither(was)
+        display.render_frame(columns, 0, display.COLOR)
+    # dither_pause redraws while at least two gaps of the step are left
+    period = config.DITHER_FRAME_MS
+    cycle_us = total // frames + period * 1000
+    fits = (display.scroll_delay - period) * 1000 // cycle_us
+    note = (str(fits) + " redraws per " + str(display.scroll_delay) + " ms scroll step ("
+            + str(period) + " ms apart), " + str(1000000 // cycle_us) + " redraws/s, "
+            + str(1000000 // (cycle_us * display.DITHER_PHASES)) + " Hz dither cycle")
+    return "redraw", frames, total, note
+
+
+def _bench_np_write():
+    n = 50
+    start = time.ticks_us()
+    for _ in range(n):
+        display.np.write()
+    return "write", n, time.ticks_diff(time.ticks_us(), start)
+
+
+def _bench_show_status():
+    n = 20
+    start = time.ticks_us()
+    for _ in range(n):
+        display.show_status("NoWiFi")
+    return "status", n, time.ticks_diff(time.ticks_us(), start)
+
+
+def _bench_power_limit():
+    columns = display.text_to_columns(BENCH_TEXT)
+    color = display.COLOR
+    width = display.LAYOUT.width
+    num_leds = display.LAYOUT.num_leds
+    frames = 0
+    start = time.ticks_us()
+    for offset in range(-width, len(columns)):
+        power.limit(columns, offset, width, num_leds, color)
+        frames += 1
+    return "frame", frames, time.ticks_diff(time.ticks_us(), start)
+
+
+def _alloc_frames(columns, pause_ms):
+    """Scroll columns once through frame.show, as main.scroll_fact does. Returns frames drawn."""
+    frames = 0
+    for offset in range(-display.LAYOUT.width, len(columns)):
+        frame.show(columns, offset, power.LEVELS, pause_ms)
+        frames += 1
+    return frames
+
+
+def _bench_alloc():
+    """Heap bytes allocated by steady-state scroll frames, dithering off and on.
+
+    Raises AllocError unless both are 0. Each frame waits two dither periods,
+    so with dithering on it also redraws once.
+    """
+    columns = display.text_to_columns(BENCH_TEXT)
+    pause_ms = 2 * config.DITHER_FRAME_MS
+    was = display.set_dither(False)
+    frames = total = 0
+    allocated = [0, 0]
+    try:
+        for dither in (False, True):
+            display.set_dither(dither)
+            _alloc_frames(columns, pause_ms)  # warm up the pattern caches first
+            gc.collect()
+            gc.disable()
+            before = gc.mem_alloc()
+            start = time.ticks_us()
+            frames += _alloc_frames(columns, pause_ms)
+            total += time.ticks_diff(time.ticks_us(), start)
+            allocated[dither] = gc.mem_alloc() - before
+            gc.enable()
+    finally:
+        gc.enable()
+        display.set_dither(was)
+        telemetry.frames_paused()
+    note = (str(allocated[0]) + " bytes allocated, " + str(allocated[1]) + " dithered, incl. "
+            + str(pause_ms) + " ms pause")
+    if allocated[0] or allocated[1]:
+        raise AllocError(note + ", expected 0")
+    return "frame", frames, total, note
+
+
+_fx_frames = 0
+
+
+def _fx_render(columns, offset, level):
+    global _fx_frames
+    display.render_frame(columns, offset, display.COLOR, level)
+    _fx_frames += 1
+    return False
+
+
+def _play(name, columns):
+    saved = effects.transition
+    effects.transition = name
+    try:
+        if name == "hold":
+            effects.hold(columns, 0, _fx_render)
+        else:
+            effects.enter(columns, 0, _fx_render)
+    finally:
+        effects.transition = saved
+
+
+def _transition_bench(name):
+    """Frame cost of one transition (or the hold), and heap bytes it allocates."""
+    def bench():
+        global _fx_frames
+        columns = display.text_to_columns(BENCH_TEXT)
+        _play(name, columns)  # warm up the scratch arrays and pattern caches
+        gc.collect()
+        gc.disable()
+        _fx_frames = 0
+        before = gc.mem_alloc()
+        start = time.ticks_us()
+        _play(name, columns)
+        total = time.ticks_diff(time.ticks_us(), start)
+        allocated = gc.mem_alloc() - before
+        gc.enable()
+        return "frame", _fx_frames, total, str(allocated) + " bytes allocated"
+    return bench
+
+
+def _bench_tls():
+    """Full then resumed TLS handshakes against config.TLS_BENCH_URL (needs WiFi)."""
+    if not config.TLS_BENCH_URL:
+        return "handshake", 0, 0, "set config.TLS_BENCH_URL to run"
+    https.forget()
+    https.get_json(config.TLS_BENCH_URL, {})
+    full_ms = https.handshake_ms
+    full_heap = https.handshake_heap
+    count = total = heap = reused = 0
+    for _ in range(TLS_RESUMES):
+        https.get_json(config.TLS_BENCH_URL, {})
+        count += 1
+        total += https.handshake_ms * 1000
+        heap = max(heap, https.handshake_heap)
+        reused += https.resumed
+    note = ("full " + str(full_ms) + " ms, heap " + str(full_heap) + "; resumed "
+            + str(reused) + "/" + str(count) + ", heap " + str(heap))
+    return "handshake", count, total, note
+
+
+def _bench_menu():
+    """Settings menu key handling, screen draw and dirty-page compare, per key (no OLED needed)."""
+    try:
+        import framebuf
+        import menu
+    except ImportError as e:
+        return "key", 0, 0, "needs framebuf and ssd1306: " + str(e)
+
+    class NullOled(framebuf.FrameBuffer):
+        def __init__(self):
+            self.buffer = bytearray(128 * 64 // 8)
+            super().__init__(self.buffer, 128, 64, framebuf.MONO_VLSB)
+
+        def show(self):
+            pass
+
+        def write_cmd(self, cmd):
+            pass
+
+        def write_data(self, buf):
+            pass
+
+    oled = NullOled()
+    settings = dict(DEFAULT_SETTINGS)
+    menu.prepare(settings)
+    presses = (keys.KEY_DOWN, keys.KEY_DOWN, keys.KEY_UP, keys.KEY_RIGHT)
+    count = 0
+    start = time.ticks_us()
+    for _ in range(MENU_ROUNDS):
+        for key in presses:
+            menu.press(oled, None, settings, key)
+            count += 1
+    total = time.ticks_diff(time.ticks_us(), start)
+    return "key", count, total, "OLED send not included"
+
+
+def _panels_bench(count, height=8):
+    def bench():
+        lay = layout.Layout(layout.chain(count, 32, height), 32 * count, height, 32 * height * count)
+        saved_np = display.np
+        saved_layout = display.LAYOUT
+        display.np = _NullStrip(lay.num_leds)
+        display.set_layout(lay)
+        try:
+            columns = display.text_to_columns(BENCH_TEXT)
+            frames = 0
+            start = time.ticks_us()
+            for offset in range(-lay.width, len(columns)):
+                display.render_frame(columns, offset, display.COLOR)
+                frames += 1
+            total = time.ticks_diff(time.ticks_us(), start)
+        finally:
+            display.np = saved_np
+            display.set_layout(saved_layout)
+        write_us = lay.num_leds * WS2812_US_PER_LED
+        max_fps = 1000000 // (total // frames + write_us)
+        ns_per_pixel = total * 1000 // (frames * lay.num_leds)
+        note = (str(lay.num_leds) + " LEDs, " + str(ns_per_pixel) + " ns/pixel, max "
+                + str(max_fps) + " fps incl. " + str(write_us) + " us write")
+        return "frame", frames, total, note
+    return bench
+
+
+BENCHMARKS = [
+    ("text_to_columns", _bench_text_to_columns),
+    ("render_frame", _bench_render_frame),
+    ("render_color", _bench_render_color),
+    ("dither", _bench_dither),
+    ("font_width", _bench_font_width),
+    ("np_write", _bench_np_write),
+    ("show_status", _bench_show_status),
+    ("power_limit", _bench_power_limit),
+    ("alloc", _bench_alloc),
+    ("tls", _bench_tls),
+    ("menu", _bench_menu),
+]
+for _name in effects.TRANSITIONS[1:] + ("hold",):
+    BENCHMARKS.append(("fx_" + _name, _transition_bench(_name)))
+for _count in PANEL_COUNTS:
+    BENCHMARKS.append(("panels_" + str(_count), _panels_bench(_count)))
+for _height in TALL_HEIGHTS:
+    BENCHMARKS.append(("tall_" + str(_height), _panels_bench(1, _height)))
+
+
+def run(names=None):
+    """Run all benchmarks (or only those named) and print the results.
+
+    Returns each benchmark's average cost, or None where a check failed.
+    """
+    results = {}
+    for name, fn in BENCHMARKS:
+        if names and name not in names:
+            continue
+        try:
+            result = fn()
+        except AllocError as e:
+            print(name + ": FAILED,", e)
+            results[name] = None
+            continue
+        unit, count, total_us = result[:3]
+        avg = total_us // count if count else 0
+        rate = 1000000 // avg if avg else 0
+        if len(result) > 3:
+            print(name + ":", avg, "us/" + unit + ",", rate, unit + "/s", "(" + result[3] + ")")
+        else:
+            print(name + ":", avg, "us/" + unit + ",", rate, unit + "/s")
+        results[name] = avg
+    display.clear_display()
+    return results
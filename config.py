@@ -8,23 +8,73 @@ WIFI_PASSWORD = "YOUR_WIFI_PASSWORD"
 # API Configuration
 API_BASE_URL = "YOUR_KIBBLE_URL"  # Base URL only, e.g. "https://your-kibble-instance.com"
 API_KEY = "YOUR_KIBBLE_API"
+HTTP_HEAD_MAX = 1024  # Longest HTTP status line + headers of an API response
+TLS_BENCH_URL = None  # e.g. "https://192.168.1.20:8443/" for bench tls (see tlsserver.py)
 
 # Hardware Configuration
 NEOPIXEL_PIN = 16
 MATRIX_WIDTH = 32
 MATRIX_HEIGHT = 8
 NUM_LEDS = 256
+PANELS = None  # Chained panel layout (see README); None = one vertical serpentine panel
 
 # I2C Configuration (for CardKB keyboard and SSD1306 OLED)
 I2C_SDA_PIN = 8
 I2C_SCL_PIN = 9
+I2C_FREQ = 400000  # Hardware I2C bus speed (use 100000 if the CardKB misses keys)
+KEY_TIMER_ID = 0  # Hardware timer that polls the CardKB
 
 # Display Configuration
 SCROLL_DELAY_MS = 80
 CHAR_SPACING = 1
+FONT_SCALE = 0  # Glyph scale on matrices taller than 8 rows (1-3); 0 = largest that fits
+NUMBER_COLOR = None  # e.g. "yellow" to highlight digits (see README, Color Markup)
+TOPIC_COLORS = {}  # e.g. {"Science": "blue"}: facts of a topic start in that color
+HOLD_MS = 2000  # Hold short facts and transitions still before scrolling; 0 = no hold
+DITHER = False  # Redraw frames between scroll steps to show dim colors between levels
+DITHER_FRAME_MS = 4  # Time between dither redraws (see README, Temporal Dithering)
+
+# Rotation Configuration (see README, Recently Shown Facts)
+RECENT_WINDOW = 200  # Show other facts first until this many have gone by; 0 = off
+RECENT_BITS = 2048  # Filter size per half of the window (a multiple of 8)
+
+# Power Configuration (5V LED supply)
+POWER_BUDGET_MA = 2500  # Dim frames that would draw more than this; 0 = no limit
+LED_MA_PER_CHANNEL = 20  # Current of one LED channel at full brightness
+LED_IDLE_MA = 1  # Current of one LED when off
+
+# Energy Configuration (energy_mode setting "eco", see README)
+LIGHTSLEEP_MIN_MS = 1000  # Waits at least this long use light sleep while the radio is off
+WIFI_WAKE_AHEAD_MS = 30000  # Leave WiFi power-save this long before a refresh
+QUIET_HOURS = None  # e.g. (23, 7) to blank the matrix from 23:00 to 07:00
+UTC_OFFSET_HOURS = 0  # Local time offset for QUIET_HOURS
+
+# Memory Configuration
+GC_HEADROOM_KB = 48  # Collect between facts when free heap falls below this
+GC_THRESHOLD_KB = 32  # Also collect after this much new allocation (gc.threshold)
+
+# Crash Recovery Configuration
+WDT_TIMEOUT_MS = 90000  # Reset if the main loop stalls this long; 0 = no watchdog
+WDT_TIMER_ID = 1  # Hardware timer that feeds the watchdog after Ctrl-C
+CRASH_RESET_DELAY_MS = 1000  # Pause after an unhandled error before resetting
+RESUME_MAX_CRASHES = 3  # Start fresh instead of resuming after this many crash resets at one fact
+
+# Wall Configuration (boards side by side as one display, see README)
+WALL_ROLE = None  # "leader" or "follower"; None = standalone board
+WALL_INDEX = 0  # Position of this board in the wall, 0 = leftmost
+WALL_BOARDS = 1  # Number of boards in the wall
+WALL_LEADER = None  # IP address of the leader board (followers only)
+WALL_PORT = 4210  # UDP port the leader listens on
+WALL_SYNC_MS = 2000  # Followers sync their clock with the leader this often
+WALL_LEAD_MS = 300  # A fact starts this long after the leader publishes it
 
 # Timing Configuration
 FACT_REFRESH_INTERVAL_MS = 3600000
+TELEMETRY_SAVE_MS = 3600000  # How often telemetry counters are saved to flash
 WIFI_RETRY_DELAY_MS = 5000
 WIFI_MAX_RETRIES = 20
 API_RETRY_DELAY_MS = 10000
+
+# Debug Configuration
+FRAME_LOG_PATH = None  # e.g. "frames.kfl" to record every frame (see framelog.py)
+FRAME_LOG_MAX_KB = 256
@@ -0,0 +1,217 @@
+import sys
+import select
+
+import energy
+import factstore
+import planner
+import power
+import telemetry
+import wall
+from store import DEFAULT_SETTINGS, save_settings
+
+# ---------------------------------------------------------------------------
+# Serial Control Console
+# Line-oriented commands on the USB serial REPL stream. poll() is called
+# between frames and never blocks: it only reads characters already waiting.
+# ---------------------------------------------------------------------------
+
+MAX_LINE = 80
+
+# Keys whose values are masked when printed
+_SECRET_KEYS = ("wifi_password", "api_key")
+
+# Flags picked up by the main loop at the next fact boundary
+refresh_requested = False
+settings_changed = False
+
+_settings = None
+_apply = None
+_line = ""
+_poller = None
+_ready = None  # poller.ipoll (allocation-free) where available, else poller.poll
+
+
+def init(settings, apply_fn):
+    """Attach the live settings dict and the function that applies it."""
+    global _settings, _apply, _poller, _ready
+    _settings = settings
+    _apply = apply_fn
+    try:
+        _poller = select.poll()
+        _poller.register(sys.stdin, select.POLLIN)
+        _ready = _poller.ipoll if hasattr(_poller, "ipoll") else _poller.poll
+    except (AttributeError, OSError) as e:
+        print("Console unavailable:", e)
+        _poller = None
+
+
+def poll():
+    """Consume any pending serial input and run completed command lines."""
+    global _line
+    if _poller is None:
+        return
+    while True:
+        waiting = False
+        for _ in _ready(0):
+            waiting = True
+        if not waiting:
+            return
+        ch = sys.stdin.read(1)
+        if not ch:
+            return
+        if ch == "\r" or ch == "\n":
+            line = _line.strip()
+            _line = ""
+            if line:
+                _run(line)
+        elif ch == "\x08" or ch == "\x7f":
+            _line = _line[:-1]
+        elif len(_line) < MAX_LINE:
+            _line += ch
+
+# ---------------------------------------------------------------------------
+# Commands
+# ---------------------------------------------------------------------------
+
+def _format_value(key, value):
+    if key in _SECRET_KEYS and value:
+        return "*" * min(len(value), 8)
+    return repr(value)
+
+
+def _cmd_help(args):
+    print("Commands:")
+    print("  get [key]        show settings")
+    print("  set key value    change a setting live")
+    print("  save             write settings to settings.json")
+    print("  stats            dump telemetry, recent facts and planner timing")
+    print("  power [mA]       show LED current, or set the budget (0 = off)")
+    print("  energy           show estimated energy use per energy mode")
+    print("  topics           list fetched topics (set topics 1,3 / set topics all)")
+    print("  refresh          fetch facts at the next fact boundary")
+    print("  wall             show wall mode sync and skew")
+    print("  bench [name]     run render benchmarks")
+
+
+def _cmd_get(args):
+    keys = args if args else list(DEFAULT_SETTINGS)
+    for key in keys:
+        if key in _settings:
+            print(key, "=", _format_value(key, _settings[key]))
+        else:
+            print("Unknown key:", key)
+
+
+def _parse_list(raw):
+    """Comma or space separated ids ("all" = empty list); numbers become ints."""
+    value = []
+    for item in raw.replace(",", " ").split():
+        if item == "all":
+            return []
+        value.append(int(item) if item.isdigit() else item)
+    return value
+
+
+def _cmd_set(args):
+    global settings_changed
+    if len(args) < 2:
+        print("Usage: set key value")
+        return
+    key = args[0]
+    if key not in DEFAULT_SETTINGS:
+        print("Unknown key:", key)
+        return
+    raw = " ".join(args[1:])
+    if isinstance(DEFAULT_SETTINGS[key], int):
+        try:
+            value = int(raw)
+        except ValueError:
+            print("Not a number:", raw)
+            return
+    elif isinstance(DEFAULT_SETTINGS[key], list):
+        value = _parse_list(raw)
+    else:
+        value = raw
+    _settings[key] = value
+    _apply(_settings)
+    settings_changed = True
+    print(key, "=", _format_value(key, value))
+
+
+def _cmd_save(args):
+    save_settings(_settings)
+    print("Saved")
+
+
+def _cmd_stats(args):
+    telemetry.dump()
+    factstore.seen_report()
+    planner.report()
+    power.report()
+    energy.report()
+
+
+def _cmd_power(args):
+    if args:
+        try:
+            power.budget_ma = int(args[0])
+        except ValueError:
+            print("Not a number:", args[0])
+            return
+    power.report()
+
+
+def _cmd_energy(args):
+    energy.report()
+
+
+def _cmd_topics(args):
+    selected = _settings.get("topics")
+    for i in range(len(factstore.topic_ids)):
+        tid = factstore.topic_ids[i]
+        mark = "*" if not selected or tid in selected else " "
+        print(mark, tid, factstore.topic_names[i], "(" + str(factstore.topic_size(i)) + " facts)")
+
+
+def _cmd_wall(args):
+    wall.report()
+
+
+def _cmd_refresh(args):
+    global refresh_requested
+    refresh_requested = True
+    print("Refresh at next fact")
+
+
+def _cmd_bench(args):
+    import bench
+    bench.run(args if args else None)
+    _apply(_settings)
+
+
+_COMMANDS = {
+    "help": _cmd_help,
+    "get": _cmd_get,
+    "set": _cmd_set,
+    "save": _cmd_save,
+    "stats": _cmd_stats,
+    "wall": _cmd_wall,
+    "power": _cmd_power,
+    "energy": _cmd_energy,
+    "topics": _cmd_topics,
+    "refresh": _cmd_refresh,
+    "bench": _cmd_bench,
+}
+
+
+def _run(line):
+    parts = line.split()
+    handler = _COMMANDS.get(parts[0])
+    if handler is None:
+        print("Unknown command:", parts[0], "(try 'help')")
+        return
+    try:
+        handler(parts[1:])
+    except Exception as e:
+        print("Console error:", e)
+    telemetry.frames_paused()
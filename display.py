@@ -0,0 +1,679 @@
+import time
+from array import array
+
+import machine
+import neopixel
+
+import config
+import layout
+import power
+from fonts import FONT_START, FONT_DATA, FONT_SMALL_DATA
+from glyphs import codepoints, is_combining
+import glyphs
+from store import COLOR_MAP, COLOR_NAMES, BRIGHTNESS_MAP
+
+try:
+    from micropython import const
+except ImportError:
+    def const(x):
+        return x
+
+# Active font and its extended (non-ASCII) glyph file (set by apply_settings).
+# On matrices taller than 8 rows _FONT is a scaled copy of the font table
+# holding one column word per pixel column (see _prepare_font).
+_FONT = FONT_DATA
+_FONT_WIDTH = 5
+_EXT_FONT = None
+_font_size = None
+_proportional = False
+_scale = 1
+_spacing = config.CHAR_SPACING
+# Column byte -> scaled, vertically centered column word (None at scale 1, no shift)
+_expand = None
+# array typecode of a column word: 8, 16 or 32 rows
+_column_type = "B"
+_ITEM_SIZE = {"B": 1, "H": 2, "I": 4}
+
+# Per glyph of the active font: first column drawn and columns advanced.
+# Fixed width draws every glyph whole; proportional width (font_width
+# setting) trims the blank columns at both edges and gives glyphs with no
+# ink a half-width advance. Built with the font, so layout stays a copy.
+_glyph_offset = bytearray(len(FONT_DATA) // 5)
+_glyph_advance = bytearray([5] * (len(FONT_DATA) // 5))
+_mean_advance = 5  # average lowercase letter advance, for the type-on effect
+
+# ---------------------------------------------------------------------------
+# NeoPixel Initialization
+# ---------------------------------------------------------------------------
+pin = machine.Pin(config.NEOPIXEL_PIN, machine.Pin.OUT)
+np = neopixel.NeoPixel(pin, config.NUM_LEDS)
+
+# Color and scroll delay (set by apply_settings at boot)
+COLOR = (15, 15, 15)
+OFF = (0, 0, 0)
+scroll_delay = config.SCROLL_DELAY_MS
+
+# ---------------------------------------------------------------------------
+# Pixel Mapping
+# Compiled from config.PANELS by layout.py into a flat lookup:
+# PIXEL_MAP[col * MATRIX_HEIGHT + row] = strip index
+# ---------------------------------------------------------------------------
+LAYOUT = layout.load()
+PIXEL_MAP = LAYOUT.pixel_map
+
+# ---------------------------------------------------------------------------
+# Color Palette
+# Slot 0 draws in the color passed to render_frame; slots 1-8 are the
+# COLOR_NAMES colors scaled to the brightness setting. Each slot has its own
+# pixel bytes and column pattern caches (8-row column byte -> pixel bytes in
+# strip order, per run direction), rebuilt when the slot's color or draw level
+# changes. Taller columns are written as a stack of these 8-row patterns.
+# With dithering there is one set of pixel bytes and caches per phase.
+# ---------------------------------------------------------------------------
+_NUM_SLOTS = 1 + len(COLOR_NAMES)
+_palette = [COLOR] * _NUM_SLOTS
+_slot_base = [None] * _NUM_SLOTS
+_slot_level = bytearray(_NUM_SLOTS)
+_OFF_PIXEL = bytes(3)
+
+# ---------------------------------------------------------------------------
+# Temporal Dithering (config.DITHER)
+# At low brightness a channel value like 6.5 truncates to 6, so dim colors
+# collapse or shift hue. Colors are also kept in 1/DITHER_PHASES steps, and
+# the gap after each scroll frame is filled with redraws of it, each in the
+# next phase, where a channel with fraction k/DITHER_PHASES is one level
+# higher in k of every DITHER_PHASES redraws. The phases that round up come
+# from an error diffusion table built once; each channel starts at a
+# different phase so the whole color does not pulse at once.
+# ---------------------------------------------------------------------------
+DITHER_PHASES = const(4)
+_DITHER = bytearray(DITHER_PHASES * DITHER_PHASES)
+for _k in range(DITHER_PHASES):
+    _error = 0
+    for _p in range(DITHER_PHASES):
+        _error += _k
+        if _error >= DITHER_PHASES:
+            _error -= DITHER_PHASES
+            _DITHER[_k * DITHER_PHASES + _p] = 1
+
+_pixels = [[bytearray(3) for _ in range(DITHER_PHASES)] for _ in range(_NUM_SLOTS)]
+_patterns = tuple(tuple(({}, {}, {}) for _ in range(DITHER_PHASES)) for _ in range(_NUM_SLOTS))
+_fine = [None] * _NUM_SLOTS  # palette colors in 1/DITHER_PHASES steps
+_color_fine = None  # COLOR in 1/DITHER_PHASES steps
+_dither = config.DITHER
+_phase = 0
+
+# Last frame drawn, redrawn by dither_pause
+_last_columns = None
+_last_offset = 0
+_last_color = COLOR
+_last_level = 0
+
+# Markup tag name -> slot ("{red}" starts red text, "{}" returns to slot 0)
+_TAG_SLOTS = {b"": 0}
+for _i in range(len(COLOR_NAMES)):
+    _TAG_SLOTS[COLOR_NAMES[_i].encode()] = _i + 1
+_tag = bytearray(8)
+
+# Slot for digits outside markup (config.NUMBER_COLOR, 0 = no highlight)
+_number_slot = _TAG_SLOTS.get((config.NUMBER_COLOR or "").encode(), 0)
+
+# ---------------------------------------------------------------------------
+# Color Spans
+# text_to_columns records where the color slot changes as runs of columns:
+# span i covers columns up to _span_ends[i] in slot _span_slots[i]. They
+# belong to the last text laid out (_span_owner); single-color text has none.
+# ---------------------------------------------------------------------------
+MAX_SPANS = 32  # later color changes in a very colorful text are ignored
+_span_ends = array("H", [0] * MAX_SPANS)
+_span_slots = bytearray(MAX_SPANS)
+_span_count = 0
+_span_used = 0  # bit mask of slots in the spans
+_span_peak = 0  # slot of the brightest span color
+_span_owner = None
+_span_alias = None  # one screen of _span_owner shown from _span_shift (effects)
+_span_shift = 0
+
+# Column values and slots currently in the pixel buffer; unchanged columns are skipped
+_shown = array("L", [0] * LAYOUT.width)
+_shown_slot = bytearray(LAYOUT.width)
+_shown_buf = None
+
+# Frame recorder (enabled by config.FRAME_LOG_PATH, see framelog.py)
+frame_log = None
+
+# ---------------------------------------------------------------------------
+# Display Functions
+# ---------------------------------------------------------------------------
+
+def _show():
+    """Push the pixel buffer to the matrix, recording the frame if enabled."""
+    np.write()
+    if frame_log:
+        frame_log.write(np.buf)
+
+
+def clear_display():
+    np.fill(OFF)
+    invalidate()
+    _show()
+
+
+def _put_glyph(out, pos, glyph, offset, width, first):
+    """Write one character's columns at pos (blank if glyph is None), spaced from the previous one.
+
+    Returns the position after it. With out=None only the position advances.
+    """
+    if not first:
+        pos += _spacing  # out starts zeroed, so blanks need no writes
+    if glyph is not None and out is not None:
+        for c in range(width):
+            out[pos + c] = glyph[offset + c]
+    return pos + width
+
+
+def _ink(glyph, offset, width):
+    """(first column, column count) of a glyph to draw: all of it, or its inked columns."""
+    if not _proportional:
+        return 0, width
+    lo = 0
+    while lo < width and not glyph[offset + lo]:
+        lo += 1
+    if lo == width:
+        return 0, (width + 1) // 2
+    hi = width - 1
+    while not glyph[offset + hi]:
+        hi -= 1
+    return lo, hi - lo + 1
+
+
+def _put_ext_glyph(out, pos, glyph, first):
+    """Write an unscaled extended-font glyph at pos, scaling it to the active font."""
+    lo, n = _ink(glyph, 0, len(glyph))
+    expand = _expand
+    if expand is None:
+        return _put_glyph(out, pos, glyph, lo, n, first)
+    if not first:
+        pos += _spacing
+    if out is None:
+        return pos + n * _scale
+    for i in range(lo, lo + n):
+        word = expand[glyph[i]]
+        for _ in range(_scale):
+            out[pos] = word
+            pos += 1
+    return pos
+
+
+def _put_code(out, pos, code, font_end):
+    """Lay out one code point at pos. Returns the position after it."""
+    fw = _FONT_WIDTH
+    font = _FONT
+    offset = _glyph_offset
+    advance = _glyph_advance
+    first = pos == 0
+    if FONT_START <= code < font_end:
+        g = code - FONT_START
+        return _put_glyph(out, pos, font, g * fw + offset[g], advance[g], first)
+    if is_combining(code):
+        return pos
+    ext = _EXT_FONT
+    blank = advance[0]  # unknown characters are as wide as a space
+    if code < 0x80 or ext is None:
+        return _put_glyph(out, pos, None, 0, blank, first)
+    glyph, replacement = ext.lookup(code)
+    if glyph is not None:
+        return _put_ext_glyph(out, pos, glyph, first)
+    if replacement is None:
+        return _put_glyph(out, pos, None, 0, blank, first)
+    for r in replacement:
+        if FONT_START <= r < font_end:
+            g = r - FONT_START
+            pos = _put_glyph(out, pos, font, g * fw + offset[g], advance[g], pos == 0)
+        else:
+            pos = _put_glyph(out, pos, None, 0, blank, pos == 0)
+    return pos
+
+
+def _span_at(pos, slot):
+    """Start a span in slot at column pos (if the slot changes and a span is free)."""
+    global _span_count
+    n = _span_count
+    if slot == (_span_slots[n - 1] if n else 0) or n >= MAX_SPANS - 1:
+        return
+    if n:
+        _span_ends[n - 1] = pos
+    elif pos:
+        _span_ends[0] = pos
+        _span_slots[0] = 0
+        n = 1
+    _span_slots[n] = slot
+    _span_count = n + 1
+
+
+def _put_tag(out, pos, length, slot, font_end):
+    """Lay out an unknown markup tag as literal text ("{" and its name)."""
+    if out is not None:
+        _span_at(pos, slot)
+    pos = _put_code(out, pos, 0x7B, font_end)
+    for i in range(length):
+        pos = _put_code(out, pos, _tag[i], font_end)
+    return pos
+
+
+def _layout_text(text, out):
+    """Lay text out into out (or just measure it if out is None). Returns the column count.
+
+    "{name}" switches to a COLOR_NAMES color and "{}" back to the text color;
+    anything else in braces is shown as written.
+    """
+    font_end = FONT_START + len(_FONT) // _FONT_WIDTH
+    number_slot = _number_slot
+    pos = 0
+    slot = 0
+    tag_len = -1  # letters collected since "{", -1 outside a tag
+    for code in codepoints(text):
+        if tag_len >= 0:
+            if code == 0x7D:
+                new = _TAG_SLOTS.get(bytes(_tag[:tag_len]), -1)
+                if new >= 0:
+                    slot = new
+                    tag_len = -1
+                    continue
+            elif 0x61 <= code <= 0x7A and tag_len < len(_tag):
+                _tag[tag_len] = code
+                tag_len += 1
+                continue
+            pos = _put_tag(out, pos, tag_len, slot, font_end)
+            tag_len = -1
+        if code == 0x7B:
+            tag_len = 0
+            continue
+        if out is not None:
+            _span_at(pos, number_slot if not slot and 0x30 <= code <= 0x39 else slot)
+        pos = _put_code(out, pos, code, font_end)
+    if tag_len >= 0:
+        pos = _put_tag(out, pos, tag_len, slot, font_end)
+    return pos
+
+
+def text_to_columns(text):
+    """Convert a string (or UTF-8 bytes) to an array of column words using the active font.
+
+    Code points outside ASCII come from the extended font file, falling back to
+    an ASCII transliteration, then to blank columns. The text is measured
+    first so the array is allocated once at its final size.
+    """
+    global _span_count, _span_owner, _span_alias
+    n = _layout_text(text, None)
+    columns = blank_columns(n)
+    _span_count = 0
+    _layout_text(text, columns)
+    _span_alias = None
+    _span_owner = columns if _span_count else None
+    if _span_count:
+        _span_ends[_span_count - 1] = n
+        _index_spans()
+    return columns
+
+
+def _index_spans():
+    """Note which slots the spans use and the brightest of them."""
+    global _span_used, _span_peak
+    used = 0
+    peak = 0
+    peak_sum = -1
+    for i in range(_span_count):
+        slot = _span_slots[i]
+        used |= 1 << slot
+        if slot:
+            c = _palette[slot]
+            if c[0] + c[1] + c[2] > peak_sum:
+                peak = slot
+                peak_sum = c[0] + c[1] + c[2]
+    _span_used = used
+    _span_peak = peak
+
+
+def share_spans(frame, columns, offset):
+    """Draw frame, a copy of the screen of columns at offset, with the color spans of columns."""
+    global _span_alias, _span_shift
+    _span_alias = frame if columns is _span_owner else None
+    _span_shift = offset
+
+
+def blank_columns(n):
+    """Zeroed array of n column words for the active layout."""
+    return array(_column_type, bytes(n * _ITEM_SIZE[_column_type]))
+
+
+def char_advance():
+    """Columns from the start of one character to the next (on average if proportional)."""
+    return _mean_advance + _spacing
+
+
+def set_layout(lay):
+    """Switch the renderer to a different compiled layout."""
+    global LAYOUT, PIXEL_MAP, _shown, _shown_slot
+    LAYOUT = lay
+    PIXEL_MAP = lay.pixel_map
+    _shown = array("L", [0] * lay.width)
+    _shown_slot = bytearray(lay.width)
+    _prepare_font()
+    invalidate()
+
+
+def invalidate():
+    """Forget which columns are on the matrix (after writing np directly)."""
+    global _shown_buf
+    _shown_buf = None
+
+
+def _use_slot(slot, base, fine, level):
+    """Point a slot's pixel bytes and pattern caches at base scaled to level/LEVELS.
+
+    fine is base in 1/DITHER_PHASES steps (None = whole), used when dithering.
+    """
+    if level == _slot_level[slot] and base == _slot_base[slot]:
+        return
+    _slot_base[slot] = base
+    _slot_level[slot] = level
+    order = np.ORDER
+    if _dither:
+        n = DITHER_PHASES
+        if fine is None:
+            fine = (base[0] * n, base[1] * n, base[2] * n)
+        for phase in range(n):
+            pixel = _pixels[slot][phase]
+            for i in range(3):
+                q = fine[i] * level // power.LEVELS
+                pixel[order[i]] = q // n + _DITHER[q % n * n + (phase + i) % n]
+    else:
+        color = base
+        if level < power.LEVELS:
+            color = (base[0] * level // power.LEVELS, base[1] * level // power.LEVELS,
+                     base[2] * level // power.LEVELS)
+        pixel = _pixels[slot][0]
+        for i in range(3):
+            pixel[order[i]] = color[i]
+    for caches in _patterns[slot]:
+        for cache in caches:
+            cache.clear()
+    invalidate()
+
+
+def _column_pattern(value, step, slot):
+    """Pixel bytes for one 8-row column byte in a slot's color, in the strip order of a column run."""
+    cache = _patterns[slot][_phase][step]
+    pattern = cache.get(value)
+    if pattern is None:
+        pattern = bytearray(24)
+        pixel = _pixels[slot][_phase]
+        for row in range(8):
+            if value & (1 << row):
+                pos = 3 * (row if step == layout.ASCENDING else 7 - row)
+                pattern[pos:pos + 3] = pixel
+        cache[value] = pattern
+    return pattern
+
+
+def render_frame(columns, scroll_offset, color, level=power.LEVELS):
+    """Render columns of text data to the matrix at the given scroll offset.
+
+    Text without color spans is drawn in color. Everything is scaled to
+    level/power.LEVELS, and dimmed further if the frame is over the power budget.
+    """
+    spans = columns is _span_owner or columns is _span_alias
+    peak = color
+    if spans:
+        c = _palette[_span_peak]
+        if c[0] + c[1] + c[2] > color[0] + color[1] + color[2]:
+            peak = c
+    lay = LAYOUT
+    level = power.limit(columns, scroll_offset, lay.width, lay.num_leds, peak, level)
+    _draw(columns, scroll_offset, color, level)
+
+
+def _draw(columns, scroll_offset, color, level):
+    """Write a frame into the pixel buffer (skipping unchanged columns) and show it."""
+    global _shown_buf, _phase, _last_columns, _last_offset, _last_color, _last_level
+    _last_columns = columns
+    _last_offset = scroll_offset
+    _last_color = color
+    _last_level = level
+    if _dither:
+        _phase = (_phase + 1) % DITHER_PHASES
+        invalidate()  # every lit pixel may change with the phase
+    lay = LAYOUT
+    spans = 0
+    shift = 0
+    if columns is _span_owner:
+        spans = _span_count
+    elif columns is _span_alias:
+        spans = _span_count
+        shift = _span_shift
+    _use_slot(0, color, _color_fine if color == COLOR else None, level)
+    span = 0
+    span_end = 0x10000
+    slot = 0
+    if spans:
+        for s in range(1, _NUM_SLOTS):
+            if _span_used & (1 << s):
+                _use_slot(s, _palette[s], _fine[s], level)
+        first = scroll_offset + shift
+        while span < spans - 1 and _span_ends[span] <= first:
+            span += 1
+        span_end = _span_ends[span] - shift
+        slot = _span_slots[span]
+    height = lay.height
+    span_bytes = height * 3
+    col_start = lay.col_start
+    col_step = lay.col_step
+    buf = np.buf
+    shown = _shown
+    shown_slot = _shown_slot
+    valid = buf is _shown_buf
+    num_columns = len(columns)
+    for display_col in range(lay.width):
+        data_col = scroll_offset + display_col
+        while data_col >= span_end and span < spans - 1:
+            span += 1
+            span_end = _span_ends[span] - shift
+            slot = _span_slots[span]
+        value = columns[data_col] if 0 <= data_col < num_columns else 0
+        if valid and shown[display_col] == value and shown_slot[display_col] == slot:
+            continue
+        shown[display_col] = value
+        shown_slot[display_col] = slot
+        step = col_step[display_col]
+        if step == layout.ASCENDING:
+            start = col_start[display_col] * 3
+            if span_bytes == 24:
+                buf[start:start + 24] = _column_pattern(value, step, slot)
+            else:
+                for start in range(start, start + span_bytes, 24):
+                    buf[start:start + 24] = _column_pattern(value & 0xFF, step, slot)
+                    value >>= 8
+        elif step == layout.DESCENDING:
+            start = (col_start[display_col] - height + 1) * 3
+            if span_bytes == 24:
+                buf[start:start + 24] = _column_pattern(value, step, slot)
+            else:
+                for start in range(start + span_bytes - 24, start - 1, -24):
+                    buf[start:start + 24] = _column_pattern(value & 0xFF, step, slot)
+                    value >>= 8
+        else:
+            pixel = _pixels[slot][_phase]
+            base = display_col * height
+            for row in range(height):
+                o = PIXEL_MAP[base + row] * 3
+                buf[o:o + 3] = pixel if value & 1 else _OFF_PIXEL
+                value >>= 1
+    _shown_buf = buf
+    _show()
+
+
+def dither_pause(ms, pause):
+    """Wait ms after a frame with pause(ms), redrawing it in the next dither phases meanwhile."""
+    if not _dither or _last_columns is None:
+        pause(ms)
+        return
+    period = config.DITHER_FRAME_MS
+    end = time.ticks_add(time.ticks_ms(), ms)
+    while ms >= 2 * period:
+        pause(period)
+        dither_frame()
+        ms = time.ticks_diff(end, time.ticks_ms())
+    if ms > 0:
+        pause(ms)
+
+
+def dither_frame():
+    """Redraw the last frame in the next dither phase."""
+    _draw(_last_columns, _last_offset, _last_color, _last_level)
+
+
+def set_dither(on):
+    """Turn temporal dithering on or off. Returns the previous choice."""
+    global _dither, _phase
+    was = _dither
+    if on != was:
+        _dither = on
+        _phase = 0
+        for slot in range(_NUM_SLOTS):
+            _slot_base[slot] = None
+    return was
+
+
+def show_status(message):
+    """Display a short status message centered on the matrix (non-scrolling)."""
+    columns = text_to_columns(message)
+    start_col = max(0, (LAYOUT.width - len(columns)) // 2)
+    render_frame(columns, -start_col, COLOR)
+
+# ---------------------------------------------------------------------------
+# Font Scaling
+# Matrices taller than 8 rows draw the 8-row fonts at an integer scale,
+# vertically centered. Scaled tables are built once per font or layout change
+# so text_to_columns stays a plain table copy.
+# ---------------------------------------------------------------------------
+
+def _font_scale(height):
+    """Glyph scale for a matrix height: config.FONT_SCALE, or the largest (up to 3x) that fits."""
+    if config.FONT_SCALE:
+        return config.FONT_SCALE
+    return max(1, min(3, height // 8))
+
+
+def _prepare_advances(font, width, scale):
+    """Build the glyph offset and advance tables for an unscaled font table."""
+    global _glyph_offset, _glyph_advance, _mean_advance
+    count = len(font) // width
+    offset = bytearray(count)
+    advance = bytearray(count)
+    for g in range(count):
+        lo, n = _ink(font, g * width, width)
+        offset[g] = lo * scale
+        advance[g] = n * scale
+    _glyph_offset = offset
+    _glyph_advance = advance
+    a = ord("a") - FONT_START
+    _mean_advance = sum(advance[a:a + 26]) // 26
+
+
+def _prepare_font():
+    """Build the active font (scaled if needed) for the current font size and layout."""
+    global _FONT, _FONT_WIDTH, _EXT_FONT, _scale, _spacing, _expand, _column_type
+    if _font_size == "small":
+        font = FONT_SMALL_DATA
+        width = 3
+    else:
+        font = FONT_DATA
+        width = 5
+    _EXT_FONT = glyphs.load(_font_size)
+
+    height = LAYOUT.height
+    scale = _font_scale(height)
+    shift = max(0, (height - 8 * scale) // 2)
+    _column_type = "B" if height <= 8 else ("H" if height <= 16 else "I")
+    _scale = scale
+    _spacing = config.CHAR_SPACING * scale
+    _prepare_advances(font, width, scale)
+    if scale == 1 and shift == 0:
+        _FONT = font
+        _FONT_WIDTH = width
+        _expand = None
+        return
+
+    expand = array(_column_type, [0] * 256)
+    for byte in range(256):
+        word = 0
+        for row in range(8):
+            if byte & (1 << row):
+                word |= ((1 << scale) - 1) << (shift + row * scale)
+        expand[byte] = word
+    scaled = array(_column_type, [0] * (len(font) * scale))
+    i = 0
+    for byte in font:
+        word = expand[byte]
+        for _ in range(scale):
+            scaled[i] = word
+            i += 1
+    _FONT = scaled
+    _FONT_WIDTH = width * scale
+    _expand = expand
+
+
+def set_proportional(on):
+    """Switch between fixed and proportional glyph widths. Returns the previous choice."""
+    global _proportional
+    was = _proportional
+    if on != was:
+        _proportional = on
+        _prepare_font()
+    return was
+
+# ---------------------------------------------------------------------------
+# Settings Application
+# ---------------------------------------------------------------------------
+
+def _scale_fine(rgb, brightness):
+    """rgb at a brightness value (0-255) in 1/DITHER_PHASES steps."""
+    n = DITHER_PHASES * brightness
+    return (rgb[0] * n // 255, rgb[1] * n // 255, rgb[2] * n // 255)
+
+
+def apply_settings(settings):
+    """Apply user settings to runtime state (color, palette, brightness, font, scroll speed)."""
+    global COLOR, _color_fine, _font_size, scroll_delay
+
+    color_name = settings.get("text_color", "white")
+    base_rgb = COLOR_MAP.get(color_name, (255, 255, 255))
+
+    brightness_level = settings.get("brightness", 3)
+    if 0 <= brightness_level <= 10:
+        brightness_value = BRIGHTNESS_MAP[brightness_level]
+    else:
+        brightness_value = BRIGHTNESS_MAP[3]
+
+    factor = brightness_value / 255
+    COLOR = (int(base_rgb[0] * factor), int(base_rgb[1] * factor), int(base_rgb[2] * factor))
+    _color_fine = _scale_fine(base_rgb, brightness_value)
+    for i in range(len(COLOR_NAMES)):
+        rgb = COLOR_MAP[COLOR_NAMES[i]]
+        _palette[i + 1] = (int(rgb[0] * factor), int(rgb[1] * factor), int(rgb[2] * factor))
+        _fine[i + 1] = _scale_fine(rgb, brightness_value)
+    for slot in range(_NUM_SLOTS):
+        _slot_base[slot] = None  # the fine colors may change when the whole ones do not
+
+    font_size = "small" if settings.get("font_size", "large") == "small" else "large"
+    if font_size != _font_size:
+        _font_size = font_size
+        _prepare_font()
+    set_proportional(settings.get("font_width", "fixed") == "proportional")
+
+    delay = settings.get("scroll_delay", config.SCROLL_DELAY_MS)
+    if isinstance(delay, int) and 5 <= delay <= 500:
+        scroll_delay = delay
+    else:
+        scroll_delay = config.SCROLL_DELAY_MS
@@ -0,0 +1,160 @@
+import config
+import display
+import power
+
+try:
+    from micropython import const
+except ImportError:
+    def const(x):
+        return x
+
+# ---------------------------------------------------------------------------
+# Transitions
+#   none  scroll in from the right edge
+#   roll  the first screen drops in from the top, one row per frame
+#   wipe  the first screen is revealed left to right, one column per frame
+#   fade  the first screen fades up in FADE_STEPS brightness steps
+#   type  the first screen is typed on, one character every TYPE_FRAMES frames
+# After a transition the first screen holds for config.HOLD_MS, then the
+# fact scrolls on. Facts that fit the matrix are centered and always hold.
+# Effect frames are transforms of one screen of columns into a scratch
+# array, drawn by the normal render_frame, so they cost the same as a
+# scroll frame and allocate nothing.
+# ---------------------------------------------------------------------------
+
+TRANSITIONS = ("none", "roll", "wipe", "fade", "type")
+
+FADE_STEPS = const(8)
+TYPE_FRAMES = const(3)
+
+transition = "none"
+
+_layout = None
+_target = None  # first screen of the fact, one column word per display column
+_frame = None  # columns of the current effect frame
+
+
+def apply_settings(settings):
+    """Pick up the transition setting."""
+    global transition
+    name = settings.get("transition", "none")
+    transition = name if name in TRANSITIONS else "none"
+
+
+def start_offset(columns):
+    """Scroll offset a fact starts at: off the right edge, or its first screen."""
+    width = display.LAYOUT.width
+    n = len(columns)
+    if n <= width and config.HOLD_MS:
+        return -((width - n) // 2)
+    if transition != "none":
+        return 0
+    return -width
+
+
+def frame_count(columns):
+    """Frames scroll_fact draws for columns: transition, hold and scroll."""
+    first = start_offset(columns)
+    frames = len(columns) - first
+    if first <= -display.LAYOUT.width:
+        return frames
+    frames += config.HOLD_MS // display.scroll_delay
+    width = display.LAYOUT.width
+    name = transition
+    if name == "roll":
+        frames += display.LAYOUT.height - 1
+    elif name == "wipe":
+        frames += width
+    elif name == "fade":
+        frames += FADE_STEPS - 1
+    elif name == "type":
+        lead = -first if first < 0 else 0
+        step = display.char_advance()
+        reveals = 1
+        if width > lead + step:
+            reveals += (width - lead - step + step - 1) // step
+        frames += reveals * TYPE_FRAMES
+    return frames
+
+
+def _load_target(columns, offset):
+    """Copy the screen at offset into _target (scratch arrays follow the layout)."""
+    global _layout, _target, _frame
+    lay = display.LAYOUT
+    if lay is not _layout:
+        _layout = lay
+        _target = display.blank_columns(lay.width)
+        _frame = display.blank_columns(lay.width)
+    target = _target
+    n = len(columns)
+    for i in range(len(target)):
+        col = offset + i
+        target[i] = columns[col] if 0 <= col < n else 0
+    display.share_spans(_frame, columns, offset)
+
+
+def _reveal(frame_fn, lead, step, repeat):
+    """Copy _target into _frame step columns at a time. Returns True on a key."""
+    target = _target
+    frame = _frame
+    width = len(frame)
+    for i in range(width):
+        frame[i] = 0
+    start = 0
+    end = lead + step
+    while start < width:
+        if end > width:
+            end = width
+        for i in range(start, end):
+            frame[i] = target[i]
+        power.forget()
+        for _ in range(repeat):
+            if frame_fn(frame, 0, power.LEVELS):
+                return True
+        start = end
+        end += step
+    return False
+
+
+def enter(columns, offset, frame_fn):
+    """Play the transition onto the screen at offset.
+
+    frame_fn(columns, offset, level) draws one frame at level/power.LEVELS
+    brightness and returns True if a key was pressed; enter() then stops and
+    returns True.
+    """
+    name = transition
+    if name == "none":
+        return False
+    _load_target(columns, offset)
+    target = _target
+    frame = _frame
+    width = len(frame)
+    if name == "roll":
+        for shift in range(display.LAYOUT.height - 1, 0, -1):
+            for i in range(width):
+                frame[i] = target[i] >> shift
+            power.forget()
+            if frame_fn(frame, 0, power.LEVELS):
+                return True
+    elif name == "wipe":
+        return _reveal(frame_fn, 0, 1, 1)
+    elif name == "type":
+        lead = -offset if offset < 0 else 0
+        return _reveal(frame_fn, lead, display.char_advance(), TYPE_FRAMES)
+    elif name == "fade":
+        for i in range(width):
+            frame[i] = target[i]
+        power.forget()
+        for step in range(1, FADE_STEPS):
+            if frame_fn(frame, 0, step * power.LEVELS // FADE_STEPS):
+                return True
+    return False
+
+
+def hold(columns, offset, frame_fn):
+    """Keep the screen at offset for config.HOLD_MS. Returns True on a key."""
+    for _ in range(config.HOLD_MS // display.scroll_delay):
+        if frame_fn(columns, offset, power.LEVELS):
+            return True
+    return False
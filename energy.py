@@ -0,0 +1,222 @@
+import time
+from array import array
+
+import machine
+
+import config
+import power
+import supervisor
+
+try:
+    from micropython import const
+except ImportError:
+    def const(x):
+        return x
+
+# ---------------------------------------------------------------------------
+# Energy Modes
+#   normal  sleep_ms between frames, radio in its default power mode
+#   eco     sleep_ms between frames, WiFi power-save (modem sleep) between
+#           refreshes (full power shortly before one)
+#   quiet   during config.QUIET_HOURS: matrix blank, radio off, no polling,
+#           light sleep between clock checks
+# Light sleep drops the WiFi association and stops the key poll timer and
+# the USB serial console, so it is only used while the radio is off.
+# ---------------------------------------------------------------------------
+NORMAL = const(0)
+ECO = const(1)
+QUIET = const(2)
+_NUM_MODES = const(3)
+_MODE_NAMES = ("normal", "eco", "quiet")
+
+# Radio states
+RADIO_OFF = const(0)
+RADIO_ON = const(1)
+RADIO_POWERSAVE = const(2)
+
+# How often quiet mode checks the clock (ms)
+QUIET_CHECK_MS = 60000
+
+# Typical ESP32-S3 board currents (mA) used for the energy estimate
+CPU_ACTIVE_MA = 45
+CPU_IDLE_MA = 20
+CPU_LIGHTSLEEP_MA = 2
+RADIO_ON_MA = 60
+RADIO_POWERSAVE_MA = 15
+
+# Per-mode time slots, each a seconds + ms remainder pair so totals stay
+# small ints over long uptimes
+ELAPSED = const(0)
+IDLE = const(2)
+LIGHTSLEEP = const(4)
+RADIO_ON_TIME = const(6)
+RADIO_PS_TIME = const(8)
+_SLOTS_PER_MODE = const(10)
+
+times = array("L", [0] * (_SLOTS_PER_MODE * _NUM_MODES))
+
+mode = NORMAL
+_setting_mode = NORMAL
+_radio = RADIO_ON
+_wlan = None
+_last_ms = time.ticks_ms()
+_clock_set = False
+
+
+def _add_ms(slot, ms):
+    rem = times[slot + 1] + ms
+    if rem >= 1000:
+        times[slot] += rem // 1000
+        rem %= 1000
+    times[slot + 1] = rem
+
+
+def _account():
+    """Charge the time since the last call to the current mode and radio state."""
+    global _last_ms
+    now = time.ticks_ms()
+    dt = time.ticks_diff(now, _last_ms)
+    _last_ms = now
+    base = mode * _SLOTS_PER_MODE
+    _add_ms(base + ELAPSED, dt)
+    if _radio == RADIO_ON:
+        _add_ms(base + RADIO_ON_TIME, dt)
+    elif _radio == RADIO_POWERSAVE:
+        _add_ms(base + RADIO_PS_TIME, dt)
+
+
+def _set_radio(state):
+    """Switch the WiFi power-save mode (no-op if unchanged or unsupported)."""
+    global _radio
+    if state == _radio or _wlan is None:
+        return
+    _account()
+    try:
+        if state == RADIO_POWERSAVE:
+            _wlan.config(pm=_wlan.PM_POWERSAVE)
+        else:
+            _wlan.config(pm=_wlan.PM_PERFORMANCE)
+    except (AttributeError, ValueError, OSError) as e:
+        print("WiFi power-save unavailable:", e)
+    _radio = state
+
+
+def init(wlan):
+    """Attach the WiFi interface whose power mode is scheduled."""
+    global _wlan
+    _wlan = wlan
+
+
+def apply_settings(settings):
+    """Pick up the energy_mode setting."""
+    global mode, _setting_mode
+    _setting_mode = ECO if settings.get("energy_mode") == "eco" else NORMAL
+    if mode != QUIET:
+        _account()
+        mode = _setting_mode
+        if mode == NORMAL:
+            _set_radio(RADIO_ON)
+
+
+def pause(ms):
+    """Wait between frames (or clock checks), in light sleep if the radio is off and the wait is long."""
+    _account()
+    if _radio == RADIO_OFF and ms >= config.LIGHTSLEEP_MIN_MS:
+        machine.lightsleep(ms)
+        slot = LIGHTSLEEP
+    else:
+        time.sleep_ms(ms)
+        slot = IDLE
+    _add_ms(mode * _SLOTS_PER_MODE + slot, time.ticks_diff(time.ticks_ms(), _last_ms))
+    _account()
+
+
+def plan_radio(ms_to_refresh):
+    """Called at each fact boundary: radio power-save until a refresh is near (eco only)."""
+    if mode != ECO:
+        return
+    if ms_to_refresh <= config.WIFI_WAKE_AHEAD_MS:
+        _set_radio(RADIO_ON)
+    else:
+        _set_radio(RADIO_POWERSAVE)
+
+# ---------------------------------------------------------------------------
+# Quiet Hours
+# Needs the wall clock, set over NTP once WiFi is up.
+# ---------------------------------------------------------------------------
+
+def sync_clock():
+    """Set the RTC from NTP (only when quiet hours are configured)."""
+    global _clock_set
+    if not config.QUIET_HOURS:
+        return
+    try:
+        import ntptime
+        ntptime.settime()
+        _clock_set = True
+    except Exception as e:
+        print("NTP error:", e)
+
+
+def is_quiet_time():
+    """True during config.QUIET_HOURS (local time); False until the clock is set."""
+    if not config.QUIET_HOURS or not _clock_set:
+        return False
+    start, end = config.QUIET_HOURS
+    hour = time.localtime(time.time() + config.UTC_OFFSET_HOURS * 3600)[3]
+    if start <= end:
+        return start <= hour < end
+    return hour >= start or hour < end
+
+
+def quiet(clear_fn):
+    """Blank the matrix and turn the radio off until quiet hours end."""
+    global mode, _radio
+    print("Quiet hours")
+    clear_fn()
+    _account()
+    mode = QUIET
+    if _wlan is not None:
+        _wlan.active(False)
+    _radio = RADIO_OFF
+    while is_quiet_time():
+        supervisor.feed()
+        pause(QUIET_CHECK_MS)
+    _account()
+    mode = _setting_mode
+    if _wlan is not None:
+        _wlan.active(True)  # reconnected by the main loop's WiFi check
+        _set_radio(RADIO_ON)  # eco returns to power-save at the next fact boundary
+    _radio = RADIO_ON
+    print("Quiet hours over")
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+
+def _ms(slot):
+    return times[slot] * 1000 + times[slot + 1]
+
+
+def report():
+    """Print estimated board and LED energy use for each mode (allocates)."""
+    _account()
+    led_ma = power.average_ma()
+    idle_led_ma = config.NUM_LEDS * config.LED_IDLE_MA
+    print("--- energy ---")
+    print("mode:", _MODE_NAMES[mode])
+    for m in range(_NUM_MODES):
+        base = m * _SLOTS_PER_MODE
+        elapsed = _ms(base + ELAPSED)
+        if not elapsed:
+            continue
+        idle = _ms(base + IDLE)
+        light = _ms(base + LIGHTSLEEP)
+        active = max(0, elapsed - idle - light)
+        board_ma = (active * CPU_ACTIVE_MA + idle * CPU_IDLE_MA + light * CPU_LIGHTSLEEP_MA
+                    + _ms(base + RADIO_ON_TIME) * RADIO_ON_MA
+                    + _ms(base + RADIO_PS_TIME) * RADIO_POWERSAVE_MA) // elapsed
+        leds = idle_led_ma if m == QUIET else led_ma
+        mwh = (board_ma + leds) * 5 * elapsed // 3600000
+        print(" ", _MODE_NAMES[m] + ":", elapsed // 60000, "min, board", board_ma, "mA, LEDs",
+              leds, "mA,", mwh, "mWh")
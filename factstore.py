@@ -0,0 +1,260 @@
+from array import array
+from binascii import crc32
+
+try:
+    from urandom import getrandbits
+except ImportError:
+    from random import getrandbits
+
+import config
+import store
+import telemetry
+
+try:
+    from micropython import const
+except ImportError:
+    def const(x):
+        return x
+
+# ---------------------------------------------------------------------------
+# Topic-Indexed Fact Store
+# Facts are kept in API order, so each topic's facts are contiguous. The
+# index maps topic i to the fact range _starts[i]..._starts[i + 1], built once
+# per fetch. Picking a different set of topics only rebuilds the rotation
+# from the selected ranges: no refetch, no re-parse.
+# ---------------------------------------------------------------------------
+
+facts = []  # fact strings, grouped by topic
+topic_ids = []  # topic_id of each topic (topic_name if the API gives no id)
+topic_names = []
+_starts = array("H", [0])
+_topic_pos = {}  # topic id -> index into topic_ids
+_hashes = array("L")  # 30-bit hash of each fact's text, for the recently shown filter
+
+# Flash copy of the store, so a reset can resume without a fetch. cache_id
+# changes with every fetch and ties a resume record to one set of facts.
+CACHE_PATH = "facts.json"
+cache_id = 0
+
+
+def ingest(data):
+    """Index the facts of an API response. Returns the fact count (0 keeps the old store)."""
+    new_facts = []
+    ids = []
+    names = []
+    starts = [0]
+    if isinstance(data, dict) and "topics" in data:
+        for topic in data["topics"]:
+            name = str(topic.get("topic_name", ""))
+            color = config.TOPIC_COLORS.get(name)
+            prefix = "{" + color + "}" if color else ""
+            for fact in topic.get("facts", []):
+                content = fact.get("content", "")
+                if content:
+                    new_facts.append(prefix + str(content))
+            if len(new_facts) > starts[-1]:
+                ids.append(topic.get("topic_id", name))
+                names.append(name)
+                starts.append(len(new_facts))
+    if not new_facts:
+        return 0
+    _install(new_facts, ids, names, starts, getrandbits(30))
+    return len(new_facts)
+
+
+def _install(new_facts, ids, names, starts, new_id):
+    global facts, topic_ids, topic_names, _starts, _topic_pos, _hashes, cache_id
+    hashes = array("L", [0] * len(new_facts))
+    for i in range(len(new_facts)):
+        hashes[i] = crc32(new_facts[i].encode()) & 0x3FFFFFFF
+    _hashes = hashes
+    facts = new_facts
+    topic_ids = ids
+    topic_names = names
+    _starts = array("H", starts)
+    _topic_pos = {}
+    for i in range(len(ids)):
+        _topic_pos[ids[i]] = i
+    cache_id = new_id
+
+
+def save_cache():
+    """Write the store to flash (once per fetch)."""
+    store.save_json(CACHE_PATH, {"id": cache_id, "ids": topic_ids, "names": topic_names,
+                                 "starts": list(_starts), "facts": facts})
+
+
+def load_cache():
+    """Restore the store written by save_cache. Returns the fact count (0 if none)."""
+    data = store.load_json(CACHE_PATH)
+    if data is None:
+        return 0
+    try:
+        _install(data["facts"], data["ids"], data["names"], data["starts"], data["id"])
+    except (KeyError, TypeError, ValueError, OverflowError):
+        return 0
+    return len(facts)
+
+
+def topic_size(i):
+    """Number of facts in topic i."""
+    return _starts[i + 1] - _starts[i]
+
+
+def rotation(selected):
+    """Fact positions of the selected topic ids, in O(selected facts).
+
+    An empty selection, or one matching no current topic, selects every fact.
+    """
+    picked = []
+    for tid in selected or ():
+        i = _topic_pos.get(tid)
+        if i is not None and i not in picked:
+            picked.append(i)
+    if not picked:
+        picked = range(len(topic_ids))
+    n = 0
+    for i in picked:
+        n += topic_size(i)
+    order = array("H", bytes(2 * n))
+    pos = 0
+    for i in picked:
+        for f in range(_starts[i], _starts[i + 1]):
+            order[pos] = f
+            pos += 1
+    return order
+
+# ---------------------------------------------------------------------------
+# Recently Shown Filter
+# Two Bloom filters over fact hashes, kept in flash so they outlive fetches
+# and resets. Shown facts go into the current generation; once it holds
+# half of config.RECENT_WINDOW facts, the older generation is cleared and
+# becomes the current one. A fact counts as recent if either generation has
+# it, so the last RECENT_WINDOW / 2 to RECENT_WINDOW facts are remembered in
+# a fixed 2 * RECENT_BITS bits. Each round shows unseen facts first.
+#
+# The filter is saved only between rounds, so after a reset the saved filter
+# is the one the interrupted round was ordered with; seen_epoch counts saves.
+# ---------------------------------------------------------------------------
+
+SEEN_PATH = "seen.bin"
+_SEEN_HASHES = const(3)  # bits set per fact
+_seen_bits = config.RECENT_BITS
+_seen = bytearray(2 * (_seen_bits // 8))
+# facts in generation 0 and 1, current generation, seen_epoch
+_seen_meta = array("H", [0, 0, 0, 0])
+_CURRENT = const(2)
+_EPOCH = const(3)
+_seen_dirty = False
+
+
+def _seen_in(gen, h):
+    """True if a fact hash is in one generation."""
+    base = gen * _seen_bits
+    step = (h >> 15) | 1
+    for i in range(_SEEN_HASHES):
+        bit = base + (h + i * step) % _seen_bits
+        if not _seen[bit >> 3] & (1 << (bit & 7)):
+            return False
+    return True
+
+
+def was_shown(f):
+    """True if fact f was shown within the recent window (or looks like it)."""
+    h = _hashes[f]
+    return _seen_in(0, h) or _seen_in(1, h)
+
+
+def mark_shown(f):
+    """Record that fact f was shown. Kept in RAM until save_seen."""
+    global _seen_dirty
+    if not config.RECENT_WINDOW:
+        return
+    if was_shown(f):
+        telemetry.recent_repeat()
+        return
+    h = _hashes[f]
+    gen = _seen_meta[_CURRENT]
+    if _seen_meta[gen] >= config.RECENT_WINDOW // 2:
+        # Current generation full: forget the older one and fill it instead
+        gen ^= 1
+        n = _seen_bits // 8
+        for i in range(gen * n, gen * n + n):
+            _seen[i] = 0
+        _seen_meta[gen] = 0
+        _seen_meta[_CURRENT] = gen
+    base = gen * _seen_bits
+    step = (h >> 15) | 1
+    for i in range(_SEEN_HASHES):
+        bit = base + (h + i * step) % _seen_bits
+        _seen[bit >> 3] |= 1 << (bit & 7)
+    _seen_meta[gen] += 1
+    _seen_dirty = True
+
+
+def seen_epoch():
+    return _seen_meta[_EPOCH]
+
+
+def prefer_unseen(order):
+    """Move recently shown facts to the end of a round, keeping the order otherwise."""
+    if not config.RECENT_WINDOW:
+        return
+    seen = array("H")
+    n = 0
+    for f in order:
+        if was_shown(f):
+            seen.append(f)
+        else:
+            order[n] = f
+            n += 1
+    for f in seen:
+        order[n] = f
+        n += 1
+    telemetry.recent_checked(len(order), len(seen))
+
+
+def save_seen():
+    """Save the filter if facts were shown since the last save (call between rounds)."""
+    global _seen_dirty
+    if not _seen_dirty:
+        return
+    _seen_dirty = False
+    _seen_meta[_EPOCH] = (_seen_meta[_EPOCH] + 1) & 0xFFFF
+    store.save_blob(SEEN_PATH, (_seen, _seen_meta))
+
+
+def load_seen():
+    """Restore the saved filter (empty if none, damaged, or RECENT_BITS changed)."""
+    if not store.load_blob(SEEN_PATH, (_seen, _seen_meta)):
+        for i in range(len(_seen)):
+            _seen[i] = 0
+        for i in range(len(_seen_meta)):
+            _seen_meta[i] = 0
+
+
+def seen_report():
+    """Print the filter's hit rate, fill and estimated false positive rate."""
+    lit = 0
+    for byte in _seen:
+        while byte:
+            lit += byte & 1
+            byte >>= 1
+    # Per mille of bits set; an unseen fact looks shown if all its bits are
+    # set in either generation
+    fill = lit * 1000 // (len(_seen) * 8)
+    fp = min(1000, 2 * fill ** _SEEN_HASHES // 1000 ** (_SEEN_HASHES - 1))
+    c = telemetry.counters
+    checked = c[telemetry.RECENT_CHECKS]
+    hits = c[telemetry.RECENT_HITS]
+    print("--- recently shown ---")
+    print("window:", config.RECENT_WINDOW, " remembered:", _seen_meta[0] + _seen_meta[1],
+          " saves:", _seen_meta[_EPOCH])
+    print("checked:", checked, " already shown:", hits,
+          "(" + str(_percent(hits, checked)) + "%)", " shown again:", c[telemetry.RECENT_REPEATS])
+    print("filter bits:", len(_seen) * 8, " fill:", str(fill // 10) + "%",
+          " false positives ~" + str(fp // 10) + "." + str(fp % 10) + "%")
+
+
+def _percent(part, whole):
+    return part * 100 // whole if whole else 0
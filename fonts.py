@@ -0,0 +1,212 @@
+# Bitmap font tables for the LED matrix.
+# Each table is written as adjacent bytes literals, which the compiler joins
+# into one constant. Frozen into the firmware the tables stay in flash and cost
+# no heap; as a plain .py they are built without a temporary list of ints.
+
+# ---------------------------------------------------------------------------
+# 5x8 Bitmap Font (Adafruit GFX / glcdfont)
+# Column-encoded: each char = 5 bytes, each byte = 1 column, bit 0 = top row
+# Covers printable ASCII 32 (space) through 126 (~)
+# ---------------------------------------------------------------------------
+FONT_START = 32
+FONT_DATA = (
+    b"\x00\x00\x00\x00\x00"  # ' '
+    b"\x00\x00\x5F\x00\x00"  # '!'
+    b"\x00\x07\x00\x07\x00"  # '"'
+    b"\x14\x7F\x14\x7F\x14"  # '#'
+    b"\x24\x2A\x7F\x2A\x12"  # '$'
+    b"\x23\x13\x08\x64\x62"  # '%'
+    b"\x36\x49\x56\x20\x50"  # '&'
+    b"\x00\x08\x07\x03\x00"  # "'"
+    b"\x00\x1C\x22\x41\x00"  # '('
+    b"\x00\x41\x22\x1C\x00"  # ')'
+    b"\x2A\x1C\x7F\x1C\x2A"  # '*'
+    b"\x08\x08\x3E\x08\x08"  # '+'
+    b"\x00\x80\x70\x30\x00"  # ','
+    b"\x08\x08\x08\x08\x08"  # '-'
+    b"\x00\x00\x60\x60\x00"  # '.'
+    b"\x20\x10\x08\x04\x02"  # '/'
+    b"\x3E\x51\x49\x45\x3E"  # '0'
+    b"\x00\x42\x7F\x40\x00"  # '1'
+    b"\x72\x49\x49\x49\x46"  # '2'
+    b"\x21\x41\x49\x4D\x33"  # '3'
+    b"\x18\x14\x12\x7F\x10"  # '4'
+    b"\x27\x45\x45\x45\x39"  # '5'
+    b"\x3C\x4A\x49\x49\x31"  # '6'
+    b"\x41\x21\x11\x09\x07"  # '7'
+    b"\x36\x49\x49\x49\x36"  # '8'
+    b"\x46\x49\x49\x29\x1E"  # '9'
+    b"\x00\x00\x14\x00\x00"  # ':'
+    b"\x00\x40\x34\x00\x00"  # ';'
+    b"\x00\x08\x14\x22\x41"  # '<'
+    b"\x14\x14\x14\x14\x14"  # '='
+    b"\x00\x41\x22\x14\x08"  # '>'
+    b"\x02\x01\x59\x09\x06"  # '?'
+    b"\x3E\x41\x5D\x59\x4E"  # '@'
+    b"\x7C\x12\x11\x12\x7C"  # 'A'
+    b"\x7F\x49\x49\x49\x36"  # 'B'
+    b"\x3E\x41\x41\x41\x22"  # 'C'
+    b"\x7F\x41\x41\x41\x3E"  # 'D'
+    b"\x7F\x49\x49\x49\x41"  # 'E'
+    b"\x7F\x09\x09\x09\x01"  # 'F'
+    b"\x3E\x41\x41\x51\x73"  # 'G'
+    b"\x7F\x08\x08\x08\x7F"  # 'H'
+    b"\x00\x41\x7F\x41\x00"  # 'I'
+    b"\x20\x40\x41\x3F\x01"  # 'J'
+    b"\x7F\x08\x14\x22\x41"  # 'K'
+    b"\x7F\x40\x40\x40\x40"  # 'L'
+    b"\x7F\x02\x1C\x02\x7F"  # 'M'
+    b"\x7F\x04\x08\x10\x7F"  # 'N'
+    b"\x3E\x41\x41\x41\x3E"  # 'O'
+    b"\x7F\x09\x09\x09\x06"  # 'P'
+    b"\x3E\x41\x51\x21\x5E"  # 'Q'
+    b"\x7F\x09\x19\x29\x46"  # 'R'
+    b"\x26\x49\x49\x49\x32"  # 'S'
+    b"\x03\x01\x7F\x01\x03"  # 'T'
+    b"\x3F\x40\x40\x40\x3F"  # 'U'
+    b"\x1F\x20\x40\x20\x1F"  # 'V'
+    b"\x3F\x40\x38\x40\x3F"  # 'W'
+    b"\x63\x14\x08\x14\x63"  # 'X'
+    b"\x03\x04\x78\x04\x03"  # 'Y'
+    b"\x61\x59\x49\x4D\x43"  # 'Z'
+    b"\x00\x7F\x41\x41\x41"  # '['
+    b"\x02\x04\x08\x10\x20"  # '\'
+    b"\x00\x41\x41\x41\x7F"  # ']'
+    b"\x04\x02\x01\x02\x04"  # '^'
+    b"\x40\x40\x40\x40\x40"  # '_'
+    b"\x00\x03\x07\x08\x00"  # '`'
+    b"\x20\x54\x54\x78\x40"  # 'a'
+    b"\x7F\x28\x44\x44\x38"  # 'b'
+    b"\x38\x44\x44\x44\x28"  # 'c'
+    b"\x38\x44\x44\x28\x7F"  # 'd'
+    b"\x38\x54\x54\x54\x18"  # 'e'
+    b"\x00\x08\x7E\x09\x02"  # 'f'
+    b"\x18\xA4\xA4\x9C\x78"  # 'g'
+    b"\x7F\x08\x04\x04\x78"  # 'h'
+    b"\x00\x44\x7D\x40\x00"  # 'i'
+    b"\x20\x40\x40\x3D\x00"  # 'j'
+    b"\x7F\x10\x28\x44\x00"  # 'k'
+    b"\x00\x41\x7F\x40\x00"  # 'l'
+    b"\x7C\x04\x78\x04\x78"  # 'm'
+    b"\x7C\x08\x04\x04\x78"  # 'n'
+    b"\x38\x44\x44\x44\x38"  # 'o'
+    b"\xFC\x18\x24\x24\x18"  # 'p'
+    b"\x18\x24\x24\x18\xFC"  # 'q'
+    b"\x7C\x08\x04\x04\x08"  # 'r'
+    b"\x48\x54\x54\x54\x24"  # 's'
+    b"\x04\x04\x3F\x44\x24"  # 't'
+    b"\x3C\x40\x40\x20\x7C"  # 'u'
+    b"\x1C\x20\x40\x20\x1C"  # 'v'
+    b"\x3C\x40\x30\x40\x3C"  # 'w'
+    b"\x44\x28\x10\x28\x44"  # 'x'
+    b"\x4C\x90\x90\x90\x7C"  # 'y'
+    b"\x44\x64\x54\x4C\x44"  # 'z'
+    b"\x00\x08\x36\x41\x00"  # '{'
+    b"\x00\x00\x77\x00\x00"  # '|'
+    b"\x00\x41\x36\x08\x00"  # '}'
+    b"\x02\x01\x02\x04\x02"  # '~'
+)
+
+# ---------------------------------------------------------------------------
+# 3x5 Bitmap Font (Tom Thumb / Robey Pointer)
+# Column-encoded: each char = 3 bytes, each byte = 1 column, bit 0 = top row
+# Vertically centered on 8-row display (rows 1-5)
+# Covers printable ASCII 32 (space) through 126 (~)
+# ---------------------------------------------------------------------------
+FONT_SMALL_DATA = (
+    b"\x00\x00\x00"  # ' '
+    b"\x2E\x00\x00"  # '!'
+    b"\x06\x00\x06"  # '"'
+    b"\x3E\x14\x3E"  # '#'
+    b"\x14\x3E\x0A"  # '$'
+    b"\x12\x08\x24"  # '%'
+    b"\x1E\x2E\x38"  # '&'
+    b"\x06\x00\x00"  # "'"
+    b"\x1C\x22\x00"  # '('
+    b"\x22\x1C\x00"  # ')'
+    b"\x0A\x04\x0A"  # '*'
+    b"\x08\x1C\x08"  # '+'
+    b"\x20\x10\x00"  # ','
+    b"\x08\x08\x08"  # '-'
+    b"\x20\x00\x00"  # '.'
+    b"\x30\x08\x06"  # '/'
+    b"\x3C\x22\x1E"  # '0'
+    b"\x04\x3E\x00"  # '1'
+    b"\x32\x2A\x24"  # '2'
+    b"\x22\x2A\x14"  # '3'
+    b"\x0E\x08\x3E"  # '4'
+    b"\x2E\x2A\x12"  # '5'
+    b"\x3C\x2A\x3A"  # '6'
+    b"\x32\x0A\x06"  # '7'
+    b"\x3E\x2A\x3E"  # '8'
+    b"\x2E\x2A\x1E"  # '9'
+    b"\x14\x00\x00"  # ':'
+    b"\x20\x14\x00"  # ';'
+    b"\x08\x14\x22"  # '<'
+    b"\x14\x14\x14"  # '='
+    b"\x22\x14\x08"  # '>'
+    b"\x02\x2A\x06"  # '?'
+    b"\x1C\x2A\x2C"  # '@'
+    b"\x3C\x0A\x3C"  # 'A'
+    b"\x3E\x2A\x14"  # 'B'
+    b"\x1C\x22\x22"  # 'C'
+    b"\x3E\x22\x1C"  # 'D'
+    b"\x3E\x2A\x2A"  # 'E'
+    b"\x3E\x0A\x0A"  # 'F'
+    b"\x1C\x2A\x3A"  # 'G'
+    b"\x3E\x08\x3E"  # 'H'
+    b"\x22\x3E\x22"  # 'I'
+    b"\x10\x20\x1E"  # 'J'
+    b"\x3E\x08\x36"  # 'K'
+    b"\x3E\x20\x20"  # 'L'
+    b"\x3E\x0C\x3E"  # 'M'
+    b"\x3E\x1C\x3E"  # 'N'
+    b"\x1C\x22\x1C"  # 'O'
+    b"\x3E\x0A\x04"  # 'P'
+    b"\x1C\x32\x3C"  # 'Q'
+    b"\x3E\x1A\x2C"  # 'R'
+    b"\x24\x2A\x12"  # 'S'
+    b"\x02\x3E\x02"  # 'T'
+    b"\x1E\x20\x3E"  # 'U'
+    b"\x0E\x30\x0E"  # 'V'
+    b"\x3E\x18\x3E"  # 'W'
+    b"\x36\x08\x36"  # 'X'
+    b"\x06\x38\x06"  # 'Y'
+    b"\x32\x2A\x26"  # 'Z'
+    b"\x3E\x22\x22"  # '['
+    b"\x04\x08\x10"  # '\'
+    b"\x22\x22\x3E"  # ']'
+    b"\x04\x02\x04"  # '^'
+    b"\x20\x20\x20"  # '_'
+    b"\x02\x04\x00"  # '`'
+    b"\x34\x2C\x38"  # 'a'
+    b"\x3E\x24\x18"  # 'b'
+    b"\x18\x24\x24"  # 'c'
+    b"\x18\x24\x3E"  # 'd'
+    b"\x18\x34\x2C"  # 'e'
+    b"\x08\x3C\x0A"  # 'f'
+    b"\x18\x54\x3C"  # 'g'
+    b"\x3E\x04\x38"  # 'h'
+    b"\x3A\x00\x00"  # 'i'
+    b"\x20\x40\x3A"  # 'j'
+    b"\x3E\x18\x24"  # 'k'
+    b"\x22\x3E\x20"  # 'l'
+    b"\x3C\x1C\x3C"  # 'm'
+    b"\x3C\x04\x38"  # 'n'
+    b"\x18\x24\x18"  # 'o'
+    b"\x7C\x24\x18"  # 'p'
+    b"\x18\x24\x7C"  # 'q'
+    b"\x38\x04\x04"  # 'r'
+    b"\x28\x3C\x14"  # 's'
+    b"\x04\x3E\x24"  # 't'
+    b"\x1C\x20\x3C"  # 'u'
+    b"\x1C\x30\x1C"  # 'v'
+    b"\x3C\x38\x3C"  # 'w'
+    b"\x24\x18\x24"  # 'x'
+    b"\x0C\x50\x3C"  # 'y'
+    b"\x34\x3C\x2C"  # 'z'
+    b"\x08\x36\x22"  # '{'
+    b"\x36\x00\x00"  # '|'
+    b"\x22\x36\x08"  # '}'
+    b"\x04\x06\x02"  # '~'
+)
@@ -0,0 +1,38 @@
+import time
+
+import console
+import display
+import energy
+import keys
+import supervisor
+import telemetry
+
+# ---------------------------------------------------------------------------
+# Frame Step
+# The work done for every scroll and effect frame: feed the watchdog, draw,
+# count the frame, poll the keys and the serial console, and wait out the
+# frame gap. main.py and `bench alloc` both run frames through here, so the
+# zero-allocation check covers exactly what a scrolling board does.
+# ---------------------------------------------------------------------------
+
+def draw(columns, offset, level, delay):
+    """Draw one frame of a delay ms budget without waiting. Returns True if a key was pressed."""
+    supervisor.feed()
+    start = time.ticks_us()
+    display.render_frame(columns, offset, display.COLOR, level)
+    telemetry.frame(start, time.ticks_diff(time.ticks_us(), start), delay)
+
+    # Any queued CardKB key opens the settings menu
+    if keys.get_key():
+        return True
+
+    console.poll()
+    return False
+
+
+def show(columns, offset, level, delay):
+    """Draw one frame and wait out the delay ms gap. Returns True if a key was pressed."""
+    if draw(columns, offset, level, delay):
+        return True
+    display.dither_pause(delay, energy.pause)
+    return False
@@ -0,0 +1,281 @@
+import os
+import struct
+import time
+
+import config
+
+# ---------------------------------------------------------------------------
+# Frame Log Format
+# Header: magic "KFL1", LED count (u16), bytes per pixel (u8)
+# Frame:  ms since previous frame (u16), payload length (u16), payload
+# Payload is run-length encoded pixels: [run length (u8)][pixel bytes] ...
+# Pixel bytes are stored exactly as sent to the strip (GRB for WS2812B).
+# ---------------------------------------------------------------------------
+MAGIC = b"KFL1"
+_HEADER = "<4sHB"
+_FRAME = "<HH"
+_HEADER_SIZE = struct.calcsize(_HEADER)
+_FRAME_SIZE = struct.calcsize(_FRAME)
+
+# ---------------------------------------------------------------------------
+# Golden Corpus
+# Every (font, color) combination renders every fact and status message.
+# ---------------------------------------------------------------------------
+CORPUS_FACTS = [
+    "The speed of light is approximately 299,792 km/s",
+    "Water boils at 100 degrees Celsius at sea level",
+    " !\"#$%&'()*+,-./0123456789:;<=>?@",
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZ[\\]^_`",
+    "abcdefghijklmnopqrstuvwxyz{|}~",
+    "Caf\u00e9 \u201cna\u00efve\u201d \u2014 25\u00b0C \u2026 \u00c6r\u00f8 \u00df",
+    "i",
+    "",
+]
+CORPUS_STATUS = ["WiFi", "NoWiFi", "Load", "NoAPI", "WiFi?"]
+CORPUS_FONTS = ["large", "small"]
+CORPUS_COLORS = [("white", 3), ("pink", 0), ("orange", 10)]
+
+
+def _encode(buf, bpp, out):
+    """Run-length encode a pixel buffer into out. Returns encoded length."""
+    n = 0
+    i = 0
+    end = len(buf)
+    while i < end:
+        run = 1
+        j = i + bpp
+        while j < end and run < 255:
+            k = 0
+            while k < bpp and buf[j + k] == buf[i + k]:
+                k += 1
+            if k < bpp:
+                break
+            run += 1
+            j += bpp
+        out[n] = run
+        for k in range(bpp):
+            out[n + 1 + k] = buf[i + k]
+        n += bpp + 1
+        i = j
+    return n
+
+
+def _decode(payload, bpp, num_leds):
+    """Expand a run-length encoded payload back into a pixel buffer."""
+    buf = bytearray(num_leds * bpp)
+    pos = 0
+    i = 0
+    while i < len(payload):
+        run = payload[i]
+        pixel = payload[i + 1:i + 1 + bpp]
+        for _ in range(run):
+            buf[pos:pos + bpp] = pixel
+            pos += bpp
+        i += bpp + 1
+    return buf
+
+# ---------------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------------
+
+class FrameLog:
+    """Append-only binary log of LED frames with inter-frame timing."""
+
+    def __init__(self, path, num_leds, bpp=3, max_bytes=0):
+        self._f = open(path, "wb")
+        self._f.write(struct.pack(_HEADER, MAGIC, num_leds, bpp))
+        self._bpp = bpp
+        self._enc = bytearray(num_leds * (bpp + 1))  # worst case: no runs
+        self._max_bytes = max_bytes
+        self._size = _HEADER_SIZE
+        self._last = None
+        self.frames = 0
+
+    def write(self, buf, dt=None):
+        """Append one frame. dt overrides the measured ms since the last frame."""
+        if self._f is None:
+            return
+        now = time.ticks_ms()
+        if dt is None:
+            dt = 0 if self._last is None else time.ticks_diff(now, self._last)
+        self._last = now
+        n = _encode(buf, self._bpp, self._enc)
+        if self._max_bytes and self._size + _FRAME_SIZE + n > self._max_bytes:
+            print("Frame log full after", self.frames, "frames")
+            self.close()
+            return
+        self._f.write(struct.pack(_FRAME, min(dt, 0xFFFF), n))
+        self._f.write(memoryview(self._enc)[:n])
+        self._size += _FRAME_SIZE + n
+        self.frames += 1
+        if self.frames % 64 == 0:
+            self._f.flush()
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+
+class FrameSink:
+    """Stand-in for the NeoPixel strip that logs each write() instead of driving LEDs."""
+
+    ORDER = (1, 0, 2, 3)
+
+    def __init__(self, num_leds, log):
+        self.n = num_leds
+        self.bpp = 3
+        self.buf = bytearray(num_leds * 3)
+        self.dt = 0
+        self._log = log
+
+    def __len__(self):
+        return self.n
+
+    def __setitem__(self, index, color):
+        offset = index * 3
+        self.buf[offset] = color[1]
+        self.buf[offset + 1] = color[0]
+        self.buf[offset + 2] = color[2]
+
+    def fill(self, color):
+        for i in range(self.n):
+            self[i] = color
+
+    def write(self):
+        self._log.write(self.buf, self.dt)
+
+# ---------------------------------------------------------------------------
+# Reading, Diff and Replay
+# ---------------------------------------------------------------------------
+
+def read_frames(path):
+    """Yield (num_leds, bpp, dt_ms, pixel_buffer) for every frame in a log."""
+    with open(path, "rb") as f:
+        magic, num_leds, bpp = struct.unpack(_HEADER, f.read(_HEADER_SIZE))
+        if magic != MAGIC:
+            raise ValueError("not a frame log: " + path)
+        while True:
+            head = f.read(_FRAME_SIZE)
+            if len(head) < _FRAME_SIZE:
+                return
+            dt, n = struct.unpack(_FRAME, head)
+            yield num_leds, bpp, dt, _decode(f.read(n), bpp, num_leds)
+
+
+def _next_frame(frames):
+    try:
+        return next(frames)
+    except StopIteration:
+        return None
+
+
+def diff(golden_path, candidate_path, limit=10, timing=False):
+    """Compare two logs frame by frame. Prints the first mismatches, returns their count."""
+    golden = read_frames(golden_path)
+    candidate = read_frames(candidate_path)
+    index = 0
+    mismatches = 0
+    while True:
+        a = _next_frame(golden)
+        b = _next_frame(candidate)
+        if a is None or b is None:
+            if a is not None or b is not None:
+                print("Frame count differs: log ends at frame", index,
+                      "in", golden_path if a is None else candidate_path)
+                mismatches += 1
+            break
+        bpp = a[1]
+        differing = 0
+        first = -1
+        if a[3] != b[3]:
+            for i in range(0, len(a[3]), bpp):
+                if a[3][i:i + bpp] != b[3][i:i + bpp]:
+                    differing += 1
+                    if first < 0:
+                        first = i // bpp
+        if differing or (timing and a[2] != b[2]):
+            mismatches += 1
+            if mismatches <= limit:
+                if differing:
+                    o = first * bpp
+                    print("Frame", index, ":", differing, "pixels differ, first LED", first,
+                          tuple(a[3][o:o + bpp]), "->", tuple(b[3][o:o + bpp]))
+                else:
+                    print("Frame", index, ": timing", a[2], "->", b[2], "ms")
+        index += 1
+    print("Compared", index, "frames,", mismatches, "mismatches")
+    return mismatches
+
+
+def replay(path, strip):
+    """Play a recorded log back onto a NeoPixel strip with its original timing."""
+    for num_leds, bpp, dt, buf in read_frames(path):
+        time.sleep_ms(dt)
+        strip.buf[:len(buf)] = buf
+        strip.write()
+
+# ---------------------------------------------------------------------------
+# Golden Corpus Recording
+# ---------------------------------------------------------------------------
+
+def _render_corpus(app, sink):
+    """Drive the app's render path through every corpus entry."""
+    from store import DEFAULT_SETTINGS
+
+    for font in CORPUS_FONTS:
+        for color, brightness in CORPUS_COLORS:
+            settings = dict(DEFAULT_SETTINGS)
+            settings["font_size"] = font
+            settings["text_color"] = color
+            settings["brightness"] = brightness
+            app.apply_settings(settings)
+
+            sink.dt = 0
+            for message in CORPUS_STATUS:
+                app.show_status(message)
+
+            sink.dt = app.scroll_delay
+            for fact in CORPUS_FACTS:
+                columns = app.text_to_columns(fact)
+                for offset in range(-config.MATRIX_WIDTH, len(columns)):
+                    app.render_frame(columns, offset, app.COLOR)
+
+
+def record_corpus(path):
+    """Render the golden corpus through the display render path into a frame log."""
+    import display as app
+    from store import load_settings
+
+    log = FrameLog(path, config.NUM_LEDS)
+    strip = app.np
+    app.np = FrameSink(config.NUM_LEDS, log)
+    try:
+        _render_corpus(app, app.np)
+    finally:
+        app.np = strip
+        app.apply_settings(load_settings())
+        log.close()
+    print("Recorded", log.frames, "frames to", path)
+    return log.frames
+
+
+# Where check_corpus renders the candidate unless told to keep it
+CHECK_PATH = "corpus_check.tmp"
+
+
+def check_corpus(golden_path, candidate_path=None, limit=10):
+    """Re-render the corpus and diff it against a golden log. Returns mismatch count.
+
+    The candidate is deleted afterwards unless candidate_path names where to keep it.
+    """
+    path = candidate_path or CHECK_PATH
+    record_corpus(path)
+    try:
+        return diff(golden_path, path, limit)
+    finally:
+        if candidate_path is None:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,197 @@
+import struct
+from array import array
+
+# ---------------------------------------------------------------------------
+# Extended Font Files (.kfx)
+# Glyphs beyond ASCII 32-126 live in a flash file built by mkfont.py, so a
+# wide character set costs only a small in-RAM cache. Layout:
+#   header:  magic "KFX1", glyph width (u8), glyph count (u16), translit count (u16)
+#   glyphs:  sorted code points (u16 each), then width bytes per glyph
+#   translit: sorted code points (u16 each), then 3 ASCII bytes per entry
+#             (zero padded; all zero = drop the character)
+# Both tables are binary-searched directly in the file.
+# ---------------------------------------------------------------------------
+MAGIC = b"KFX1"
+HEADER = "<4sBHH"
+TRANSLIT_LEN = 3
+
+# Extended font file for each font_size setting
+FONT_FILES = {
+    "large": "font_large.kfx",
+    "small": "font_small.kfx",
+}
+
+# Recently used glyphs kept in RAM
+CACHE_SIZE = 16
+
+# Cache slot states
+_EMPTY = 0
+_GLYPH = 1
+_TRANSLIT = 2
+_MISSING = 3
+
+
+class ExtFont:
+    """Extended glyph lookup over a .kfx file with a small LRU cache."""
+
+    def __init__(self, path):
+        self._f = open(path, "rb")
+        magic, width, glyphs, translits = struct.unpack(HEADER, self._f.read(struct.calcsize(HEADER)))
+        if magic != MAGIC:
+            self._f.close()
+            raise ValueError("not a font file: " + path)
+        self.width = width
+        self._glyph_count = glyphs
+        self._glyph_index = struct.calcsize(HEADER)
+        self._glyph_data = self._glyph_index + 2 * glyphs
+        self._translit_count = translits
+        self._translit_index = self._glyph_data + width * glyphs
+        self._translit_data = self._translit_index + 2 * translits
+
+        slot_size = max(width, TRANSLIT_LEN)
+        self._slot_size = slot_size
+        self._codes = array("H", bytes(2 * CACHE_SIZE))
+        self._state = bytearray(CACHE_SIZE)
+        self._used = array("L", [0] * CACHE_SIZE)
+        self._data = bytearray(CACHE_SIZE * slot_size)
+        self._view = memoryview(self._data)
+        self._clock = 0
+        self._u16 = bytearray(2)
+
+    def _search(self, index_pos, count, code):
+        """Binary search a sorted u16 code point index. Returns position or -1."""
+        f = self._f
+        u16 = self._u16
+        lo = 0
+        hi = count - 1
+        while lo <= hi:
+            mid = (lo + hi) // 2
+            f.seek(index_pos + 2 * mid)
+            f.readinto(u16)
+            value = u16[0] | (u16[1] << 8)
+            if value == code:
+                return mid
+            if value < code:
+                lo = mid + 1
+            else:
+                hi = mid - 1
+        return -1
+
+    def _slot(self, code):
+        """Return the cache slot holding code, filling the least recently used on a miss."""
+        self._clock += 1
+        oldest = 0
+        for i in range(CACHE_SIZE):
+            if self._state[i] != _EMPTY and self._codes[i] == code:
+                self._used[i] = self._clock
+                return i
+            if self._used[i] < self._used[oldest]:
+                oldest = i
+
+        i = oldest
+        start = i * self._slot_size
+        self._codes[i] = code
+        self._used[i] = self._clock
+        pos = self._search(self._glyph_index, self._glyph_count, code)
+        if pos >= 0:
+            self._f.seek(self._glyph_data + pos * self.width)
+            self._f.readinto(self._view[start:start + self.width])
+            self._state[i] = _GLYPH
+            return i
+        pos = self._search(self._translit_index, self._translit_count, code)
+        if pos >= 0:
+            self._f.seek(self._translit_data + pos * TRANSLIT_LEN)
+            self._f.readinto(self._view[start:start + TRANSLIT_LEN])
+            self._state[i] = _TRANSLIT
+            return i
+        self._state[i] = _MISSING
+        return i
+
+    def lookup(self, code):
+        """Return (glyph_columns, None), (None, ascii_replacement) or (None, None)."""
+        if code > 0xFFFF:
+            return None, None
+        i = self._slot(code)
+        start = i * self._slot_size
+        state = self._state[i]
+        if state == _GLYPH:
+            return self._view[start:start + self.width], None
+        if state == _TRANSLIT:
+            end = start
+            while end < start + TRANSLIT_LEN and self._data[end]:
+                end += 1
+            return None, self._view[start:end]
+        return None, None
+
+
+_fonts = {}
+
+
+def load(font_size):
+    """Open (once) the extended font for a font_size setting. Returns ExtFont or None."""
+    path = FONT_FILES.get(font_size)
+    if path is None:
+        return None
+    if path not in _fonts:
+        try:
+            _fonts[path] = ExtFont(path)
+        except (OSError, ValueError) as e:
+            print("Extended font unavailable:", path, e)
+            _fonts[path] = None
+    return _fonts[path]
+
+# ---------------------------------------------------------------------------
+# Code Point Decoding
+# ---------------------------------------------------------------------------
+
+def is_combining(code):
+    """True for combining diacritics and zero-width marks, which take no columns."""
+    return 0x0300 <= code < 0x0370 or code == 0x200B or code == 0x200D or code == 0xFEFF
+
+
+def codepoints(text):
+    """Yield Unicode code points from a str or from UTF-8 encoded bytes.
+
+    Invalid UTF-8 sequences yield U+FFFD.
+    """
+    if isinstance(text, str):
+        for char in text:
+            yield ord(char)
+        return
+    i = 0
+    n = len(text)
+    while i < n:
+        b = text[i]
+        if b < 0x80:
+            yield b
+            i += 1
+            continue
+        if 0xC0 <= b < 0xE0:
+            extra = 1
+            code = b & 0x1F
+        elif 0xE0 <= b < 0xF0:
+            extra = 2
+            code = b & 0x0F
+        elif 0xF0 <= b < 0xF8:
+            extra = 3
+            code = b & 0x07
+        else:
+            yield 0xFFFD
+            i += 1
+            continue
+        if i + extra >= n:
+            yield 0xFFFD  # truncated sequence
+            return
+        valid = True
+        for k in range(1, extra + 1):
+            c = text[i + k]
+            if c & 0xC0 != 0x80:
+                valid = False
+                break
+            code = (code << 6) | (c & 0x3F)
+        if valid:
+            yield code
+            i += extra + 1
+        else:
+            yield 0xFFFD
+            i += 1
@@ -0,0 +1,202 @@
+import gc
+import json
+import socket
+import time
+
+try:
+    import ssl
+except ImportError:
+    import ussl as ssl
+
+try:
+    from esp32 import idf_heap_info, HEAP_DATA
+except ImportError:
+    idf_heap_info = None
+
+import config
+import telemetry
+
+# ---------------------------------------------------------------------------
+# HTTPS Fetcher
+# A lean replacement for urequests.get for the hourly fact fetch. The TLS
+# handshake is the largest transient heap user on the board, so:
+#   - one SSL context is kept for the whole uptime, and the session of the
+#     last connection is offered on the next one (an abbreviated handshake
+#     where the ssl module and the server support it; a full one otherwise)
+#   - the heap is collected just before connecting, so the TLS record
+#     buffers find contiguous free blocks
+#   - the response head is read into a buffer allocated once at import, and
+#     the JSON body is parsed straight from the socket, never held whole
+# ---------------------------------------------------------------------------
+
+_head = bytearray(config.HTTP_HEAD_MAX)
+_one = bytearray(1)
+
+_context = None
+_session = None  # TLS session of the last connection, offered on the next
+_session_host = None
+_resumable = True  # False once ssl turns out not to take a session
+
+# Handshake of the last TLS connection: abbreviated?, time and heap it took
+resumed = False
+handshake_ms = 0
+handshake_heap = 0
+
+
+def _split(url):
+    """(tls, host, port, path) of an http:// or https:// URL."""
+    scheme, _, rest = url.partition("://")
+    tls = scheme == "https"
+    host, _, path = rest.partition("/")
+    port = 443 if tls else 80
+    if ":" in host:
+        host, port = host.split(":")
+        port = int(port)
+    return tls, host, port, "/" + path
+
+
+def _get_context():
+    global _context
+    if _context is None and hasattr(ssl, "SSLContext"):
+        _context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        # Like urequests: the server certificate is not verified
+        try:
+            _context.check_hostname = False
+        except AttributeError:
+            pass
+        _context.verify_mode = ssl.CERT_NONE
+    return _context
+
+
+def forget():
+    """Drop the kept TLS session so the next connection does a full handshake."""
+    global _session, _session_host
+    _session = None
+    _session_host = None
+
+
+def _idf_free():
+    """(free, low-water mark) of the IDF data heap, where mbedTLS allocates on the ESP32."""
+    free = low = 0
+    if idf_heap_info is not None:
+        for region in idf_heap_info(HEAP_DATA):
+            free += region[1]
+            low += region[3]
+    return free, low
+
+
+def _connect(host, port):
+    ai = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)[0]
+    sock = socket.socket(ai[0], socket.SOCK_STREAM, ai[2])
+    try:
+        sock.connect(ai[-1])
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def _wrap(sock, host, session):
+    """Run the TLS handshake on sock, offering session if not None."""
+    global _resumable
+    context = _get_context()
+    if context is None:
+        return ssl.wrap_socket(sock, server_hostname=host)
+    if session is not None:
+        try:
+            return context.wrap_socket(sock, server_hostname=host, session=session)
+        except TypeError:
+            _resumable = False  # this ssl module has no session support
+    return context.wrap_socket(sock, server_hostname=host)
+
+
+def _open_tls(host, port):
+    """Connect and handshake, measuring both. Falls back to a full handshake."""
+    global resumed, handshake_ms, handshake_heap
+    session = _session if _resumable and host == _session_host else None
+    gc.collect()
+    gc_free = gc.mem_free()
+    idf_free, idf_low = _idf_free()
+    sock = _connect(host, port)
+    start = time.ticks_ms()
+    try:
+        s = _wrap(sock, host, session)
+    except Exception as e:
+        sock.close()
+        if session is None:
+            raise
+        # The server may have dropped the session: start over without it
+        print("TLS resume failed:", e)
+        forget()
+        return _open_tls(host, port)
+    handshake_ms = time.ticks_diff(time.ticks_ms(), start)
+
+    # Heap held once the handshake is done (the record buffers stay until
+    # close). A lower IDF low-water mark means the handshake peaked deeper.
+    gc_used = gc_free - gc.mem_free()
+    idf_after, idf_low_after = _idf_free()
+    idf_used = idf_free - idf_after
+    if idf_low_after < idf_low:
+        idf_used = max(idf_used, idf_free - idf_low_after)
+    handshake_heap = max(gc_used, 0) + max(idf_used, 0)
+    resumed = bool(getattr(s, "session_reused", False))
+    telemetry.handshake(resumed, handshake_ms, handshake_heap)
+    return s
+
+
+def _keep_session(s, host):
+    """Keep the session of a finished connection (TLS 1.3 sends it after the handshake)."""
+    global _session, _session_host
+    session = getattr(s, "session", None)
+    if session is not None:
+        _session = session
+        _session_host = host
+
+
+def _read_head(stream):
+    """Read the status line and headers into _head. Returns (status, content length)."""
+    n = 0
+    while True:
+        if n == len(_head):
+            raise ValueError("HTTP head over " + str(n) + " bytes")
+        if not stream.readinto(_one):
+            raise OSError("connection closed in HTTP head")
+        _head[n] = _one[0]
+        n += 1
+        if n >= 4 and _head[n - 1] == 10 and _head[n - 2] == 13 and _head[n - 3] == 10:
+            break
+    lines = bytes(_head[:n]).decode().split("\r\n")
+    status = int(lines[0].split()[1])
+    length = 0
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        name = name.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "transfer-encoding" and "chunked" in value.lower():
+            raise ValueError("chunked HTTP response")
+    return status, length
+
+
+def get_json(url, headers):
+    """GET url and parse its JSON body from the socket.
+
+    Returns (status, data, body bytes); data is None unless the status is 200.
+    """
+    tls, host, port, path = _split(url)
+    s = _open_tls(host, port) if tls else _connect(host, port)
+    try:
+        request = "GET " + path + " HTTP/1.0\r\nHost: " + host + "\r\n"
+        for name in headers:
+            request += name + ": " + headers[name] + "\r\n"
+        send = getattr(s, "sendall", None) or s.write
+        send((request + "\r\n").encode())
+        stream = s if hasattr(s, "readinto") else s.makefile("rb")
+        status, length = _read_head(stream)
+        if tls:
+            _keep_session(s, host)
+        if status != 200:
+            return status, None, 0
+        return status, json.load(stream), length
+    finally:
+        s.close()
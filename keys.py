@@ -0,0 +1,152 @@
+import time
+from array import array
+from machine import Pin, I2C, SoftI2C, Timer
+
+import config
+import telemetry
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+
+CARDKB_ADDR = 0x5F
+SSD1306_ADDR = 0x3C
+
+# CardKB key codes
+KEY_UP = 0xB5
+KEY_DOWN = 0xB6
+KEY_LEFT = 0xB4
+KEY_RIGHT = 0xB7
+KEY_ENTER = 0x0D
+KEY_BACK = 0x08
+KEY_ESC = 0x1B
+
+# CardKB poll period while facts scroll and while the settings menu is open (ms)
+TICKER_POLL_MS = 100
+MENU_POLL_MS = 20
+
+# Key events held until the application reads them (one slot stays empty)
+QUEUE_SIZE = 16
+
+
+# ---------------------------------------------------------------------------
+# I2C and Hardware Init
+# ---------------------------------------------------------------------------
+
+def init_i2c():
+    """Initialize I2C bus and detect devices. Returns (i2c, has_cardkb, has_oled)."""
+    try:
+        try:
+            i2c = I2C(0, sda=Pin(config.I2C_SDA_PIN), scl=Pin(config.I2C_SCL_PIN), freq=config.I2C_FREQ)
+        except (TypeError, ValueError, OSError) as e:
+            print("Hardware I2C unavailable, using SoftI2C:", e)
+            i2c = SoftI2C(sda=Pin(config.I2C_SDA_PIN), scl=Pin(config.I2C_SCL_PIN), freq=100000)
+        devices = i2c.scan()
+        has_cardkb = CARDKB_ADDR in devices
+        has_oled = SSD1306_ADDR in devices
+        if has_cardkb:
+            print("CardKB detected at 0x5F")
+        if has_oled:
+            print("OLED detected at 0x3C")
+        return i2c, has_cardkb, has_oled
+    except Exception as e:
+        print("I2C init error:", e)
+        return None, False, False
+
+
+# ---------------------------------------------------------------------------
+# CardKB Input
+# A timer polls the CardKB on its own schedule (also while the main loop
+# sleeps) and queues key events in a ring buffer. The application drains the
+# queue with get_key() without touching the bus. Without a timer, polls
+# happen inside get_key()/pending() once the poll period has passed.
+# ---------------------------------------------------------------------------
+
+_i2c = None
+_timer = None
+_period_ms = TICKER_POLL_MS
+_last_poll_ms = 0
+_rx = bytearray(1)
+_queue = bytearray(QUEUE_SIZE)
+_stamps = array("L", [0] * QUEUE_SIZE)  # ticks_ms when each queued key was read
+_head = 0
+_tail = 0
+key_ms = 0  # ticks_ms when the key last returned by get_key was read
+
+
+def _poll(_t=None):
+    """Read one key from the CardKB into the queue (timer callback)."""
+    global _head, _last_poll_ms
+    start = time.ticks_us()
+    try:
+        _i2c.readfrom_into(CARDKB_ADDR, _rx)
+        key = _rx[0]
+    except OSError:
+        key = 0
+    telemetry.i2c_poll(time.ticks_diff(time.ticks_us(), start))
+    _last_poll_ms = time.ticks_ms()
+    if key:
+        nxt = (_head + 1) % QUEUE_SIZE
+        if nxt == _tail:
+            telemetry.key_dropped()
+        else:
+            _queue[_head] = key
+            _stamps[_head] = _last_poll_ms
+            _head = nxt
+
+
+def _start_timer():
+    _timer.init(period=_period_ms, mode=Timer.PERIODIC, callback=_poll)
+
+
+def start(i2c):
+    """Begin polling the CardKB on i2c."""
+    global _i2c, _timer
+    _i2c = i2c
+    try:
+        _timer = Timer(config.KEY_TIMER_ID)
+        _start_timer()
+    except (ValueError, OSError) as e:
+        print("Key timer unavailable, polling inline:", e)
+        _timer = None
+
+
+def set_poll_period(ms):
+    """Change the poll period (MENU_POLL_MS or TICKER_POLL_MS)."""
+    global _period_ms
+    if ms == _period_ms:
+        return
+    _period_ms = ms
+    if _timer is not None:
+        _start_timer()
+
+
+def _service():
+    """Poll inline when no timer runs and the poll period has passed."""
+    if _timer is None and _i2c is not None:
+        if time.ticks_diff(time.ticks_ms(), _last_poll_ms) >= _period_ms:
+            _poll()
+
+
+def pending():
+    """True if a key event is waiting (does not consume it)."""
+    _service()
+    return _head != _tail
+
+
+def get_key():
+    """Non-blocking: return the next queued key code, or 0."""
+    global _tail, key_ms
+    _service()
+    if _head == _tail:
+        return 0
+    key = _queue[_tail]
+    key_ms = _stamps[_tail]
+    _tail = (_tail + 1) % QUEUE_SIZE
+    return key
+
+
+def clear():
+    """Discard queued key events."""
+    global _tail
+    _tail = _head
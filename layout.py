@@ -0,0 +1,121 @@
+from array import array
+
+import config
+
+# ---------------------------------------------------------------------------
+# Panel Layout
+# A display is one or more LED panels chained on a single data line. Each
+# panel is described by a dict (see config.PANELS):
+#   x, y        top-left corner of the panel on the virtual display
+#   width       panel columns as wired (before rotation)
+#   height      panel rows as wired (before rotation)
+#   rotation    0, 90, 180 or 270 degrees clockwise as mounted (default 0)
+#   order       "columns" if LEDs run down columns first, "rows" if along rows
+#               (default "columns")
+#   serpentine  True if every other column/row runs backwards (default True)
+# Panels appear in config.PANELS in chain order, starting at the data input.
+# ---------------------------------------------------------------------------
+
+# Column run types in Layout.col_step
+SCATTERED = 0
+ASCENDING = 1   # row r of the column is LED col_start + r
+DESCENDING = 2  # row r of the column is LED col_start - r
+
+
+def _native_index(panel, c, r):
+    """LED index within a panel for native (as wired) column c, row r."""
+    w = panel["width"]
+    h = panel["height"]
+    serpentine = panel.get("serpentine", True)
+    if panel.get("order", "columns") == "rows":
+        if serpentine and r % 2:
+            c = w - 1 - c
+        return r * w + c
+    if serpentine and c % 2:
+        r = h - 1 - r
+    return c * h + r
+
+
+def _to_native(panel, vx, vy):
+    """Map a position on the mounted (rotated) panel to native column/row."""
+    w = panel["width"]
+    h = panel["height"]
+    rotation = panel.get("rotation", 0)
+    if rotation == 90:
+        return vy, h - 1 - vx
+    if rotation == 180:
+        return w - 1 - vx, h - 1 - vy
+    if rotation == 270:
+        return w - 1 - vy, vx
+    return vx, vy
+
+
+class Layout:
+    """A panel layout compiled into flat lookup tables for the renderer."""
+
+    def __init__(self, panels, width, height, num_leds):
+        self.width = width
+        self.height = height
+        self.num_leds = num_leds
+        self.panels = len(panels)
+        # pixel_map[x * height + y] = strip index
+        self.pixel_map = array("H", [0xFFFF] * (width * height))
+
+        chain_offset = 0
+        for panel in panels:
+            w = panel["width"]
+            h = panel["height"]
+            if panel.get("rotation", 0) in (90, 270):
+                mounted_w, mounted_h = h, w
+            else:
+                mounted_w, mounted_h = w, h
+            for vx in range(mounted_w):
+                for vy in range(mounted_h):
+                    x = panel["x"] + vx
+                    y = panel["y"] + vy
+                    if not (0 <= x < width and 0 <= y < height):
+                        raise ValueError("panel at " + str((panel["x"], panel["y"])) + " exceeds the display")
+                    c, r = _to_native(panel, vx, vy)
+                    slot = x * height + y
+                    if self.pixel_map[slot] != 0xFFFF:
+                        raise ValueError("panels overlap at " + str((x, y)))
+                    self.pixel_map[slot] = chain_offset + _native_index(panel, c, r)
+            chain_offset += w * h
+
+        if chain_offset > num_leds:
+            raise ValueError("panels have " + str(chain_offset) + " LEDs, NUM_LEDS is " + str(num_leds))
+        for i in range(width * height):
+            if self.pixel_map[i] == 0xFFFF:
+                raise ValueError("no panel covers " + str((i // height, i % height)))
+
+        # Columns whose LEDs are consecutive on the strip can be written as
+        # 8-row slices of the pixel buffer instead of pixel by pixel.
+        self.col_start = array("H", [0] * width)
+        self.col_step = bytearray(width)
+        for x in range(width):
+            base = x * height
+            first = self.pixel_map[base]
+            step = SCATTERED
+            if height % 8 == 0:
+                if all(self.pixel_map[base + r] == first + r for r in range(height)):
+                    step = ASCENDING
+                elif all(self.pixel_map[base + r] == first - r for r in range(height)):
+                    step = DESCENDING
+            self.col_start[x] = first
+            self.col_step[x] = step
+
+
+def single_panel(width, height):
+    """The default layout: one vertical serpentine panel."""
+    return [{"x": 0, "y": 0, "width": width, "height": height}]
+
+
+def chain(count, width=32, height=8):
+    """count identical vertical serpentine panels side by side (for benchmarks)."""
+    return [{"x": i * width, "y": 0, "width": width, "height": height} for i in range(count)]
+
+
+def load():
+    """Compile the configured layout (config.PANELS, or a single panel)."""
+    panels = config.PANELS or single_panel(config.MATRIX_WIDTH, config.MATRIX_HEIGHT)
+    return Layout(panels, config.MATRIX_WIDTH, config.MATRIX_HEIGHT, config.NUM_LEDS)
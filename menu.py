@@ -1,192 +1,248 @@
 import time
-import json
-from machine import Pin, SoftI2C
+from array import array
 from ssd1306 import SSD1306_I2C
-import config
+import keys
+from keys import (
+    SSD1306_ADDR, KEY_UP, KEY_DOWN, KEY_LEFT, KEY_RIGHT, KEY_ENTER, KEY_BACK, KEY_ESC,
+    MENU_POLL_MS, get_key,
+)
+from store import COLOR_NAMES, save_settings
+import factstore
+import supervisor
+import telemetry
 
 # ---------------------------------------------------------------------------
 # Constants
 # ---------------------------------------------------------------------------
 
-CARDKB_ADDR = 0x5F
-SSD1306_ADDR = 0x3C
-
-# CardKB key codes
-KEY_UP = 0xB5
-KEY_DOWN = 0xB6
-KEY_LEFT = 0xB4
-KEY_RIGHT = 0xB7
-KEY_ENTER = 0x0D
-KEY_BACK = 0x08
-KEY_ESC = 0x1B
-
 # Inactivity timeout (ms)
 MENU_TIMEOUT_MS = 30000
 
-# Color name -> RGB tuple mapping
-COLOR_MAP = {
-    "white": (255, 255, 255),
-    "blue": (0, 0, 255),
-    "green": (0, 255, 0),
-    "yellow": (255, 255, 0),
-    "orange": (255, 128, 0),
-    "red": (255, 0, 0),
-    "pink": (255, 50, 150),
-    "purple": (128, 0, 255),
-}
-
-# Ordered list for menu display
-COLOR_NAMES = ["white", "blue", "green", "yellow", "orange", "red", "pink", "purple"]
-
-# Brightness 0-10 -> NeoPixel brightness value (0-255)
-BRIGHTNESS_MAP = [5, 10, 20, 35, 55, 80, 110, 145, 185, 220, 255]
-
-# Default settings (used when settings.json is missing or corrupt)
-DEFAULT_SETTINGS = {
-    "api_source": "recent",
-    "wifi_ssid": "",
-    "wifi_password": "",
-    "api_key": "",
-    "text_color": "white",
-    "brightness": 3,
-    "font_size": "large",
-    "scroll_delay": 80,
-}
-
-# Screen definitions
-SCREENS = [
-    {
-        "title": "DATA SOURCE",
-        "key": "api_source",
-        "type": "select",
-        "options": [
-            ("Recent Facts", "recent"),
-            ("All Facts", "all"),
-        ],
-    },
-    {
-        "title": "WIFI & API",
-        "key": None,
-        "type": "text_entry",
-        "fields": [
-            ("WiFi SSID", "wifi_ssid"),
-            ("WiFi Password", "wifi_password"),
-            ("API Key", "api_key"),
-        ],
-    },
-    {
-        "title": "TEXT COLOR",
-        "key": "text_color",
-        "type": "select",
-        "options": [(n[0].upper() + n[1:], n) for n in COLOR_NAMES],
-    },
-    {
-        "title": "BRIGHTNESS",
-        "key": "brightness",
-        "type": "select",
-        "options": [("Level " + str(i), i) for i in range(11)],
-    },
-    {
-        "title": "FONT SIZE",
-        "key": "font_size",
-        "type": "select",
-        "options": [
-            ("Large", "large"),
-            ("Small", "small"),
-        ],
-    },
-    {
-        "title": "SCROLL SPEED",
-        "key": "scroll_delay",
-        "type": "number_entry",
-        "min": 5,
-        "max": 500,
-        "unit": "ms",
-    },
-]
-
-
-# ---------------------------------------------------------------------------
-# Settings Persistence
-# ---------------------------------------------------------------------------
-
-def load_settings():
-    """Load settings from settings.json. Returns defaults if missing/corrupt."""
-    try:
-        with open("settings.json", "r") as f:
-            saved = json.load(f)
-        merged = dict(DEFAULT_SETTINGS)
-        for key in DEFAULT_SETTINGS:
-            if key in saved:
-                merged[key] = saved[key]
-        return merged
-    except (OSError, ValueError):
-        return dict(DEFAULT_SETTINGS)
-
-
-def save_settings(settings):
-    """Write settings dict to settings.json."""
-    try:
-        with open("settings.json", "w") as f:
-            json.dump(settings, f)
-    except OSError as e:
-        print("Settings save error:", e)
+# Menu rows shown below the title bar
+_VISIBLE = 5
+
+# Settings screens, built with the menu model by init_oled (None without an OLED)
+SCREENS = None
+
+
+def _screen_defs():
+    """The settings screens (option lists are only built when an OLED is found)."""
+    return [
+        {
+            "title": "DATA SOURCE",
+            "key": "api_source",
+            "type": "select",
+            "options": [
+                ("Recent Facts", "recent"),
+                ("All Facts", "all"),
+            ],
+        },
+        {
+            "title": "WIFI & API",
+            "key": None,
+            "type": "text_entry",
+            "fields": [
+                ("WiFi SSID", "wifi_ssid"),
+                ("WiFi Password", "wifi_password"),
+                ("API Key", "api_key"),
+            ],
+        },
+        {
+            "title": "TOPICS",
+            "key": "topics",
+            "type": "topics",
+        },
+        {
+            "title": "TEXT COLOR",
+            "key": "text_color",
+            "type": "select",
+            "options": [(n[0].upper() + n[1:], n) for n in COLOR_NAMES],
+        },
+        {
+            "title": "BRIGHTNESS",
+            "key": "brightness",
+            "type": "select",
+            "options": [("Level " + str(i), i) for i in range(11)],
+        },
+        {
+            "title": "FONT SIZE",
+            "key": "font_size",
+            "type": "select",
+            "options": [
+                ("Large", "large"),
+                ("Small", "small"),
+            ],
+        },
+        {
+            "title": "FONT WIDTH",
+            "key": "font_width",
+            "type": "select",
+            "options": [
+                ("Fixed", "fixed"),
+                ("Proportional", "proportional"),
+            ],
+        },
+        {
+            "title": "SCROLL SPEED",
+            "key": "scroll_delay",
+            "type": "number_entry",
+            "min": 5,
+            "max": 500,
+            "unit": "ms",
+        },
+        {
+            "title": "TRANSITION",
+            "key": "transition",
+            "type": "select",
+            "options": [
+                ("Scroll", "none"),
+                ("Roll", "roll"),
+                ("Wipe", "wipe"),
+                ("Fade", "fade"),
+                ("Type", "type"),
+            ],
+        },
+        {
+            "title": "ENERGY MODE",
+            "key": "energy_mode",
+            "type": "select",
+            "options": [
+                ("Normal", "normal"),
+                ("Eco", "eco"),
+            ],
+        },
+    ]
 
 
 # ---------------------------------------------------------------------------
-# I2C and Hardware Init
+# OLED Init
 # ---------------------------------------------------------------------------
 
-def init_i2c():
-    """Initialize I2C bus and detect devices. Returns (i2c, has_cardkb, has_oled)."""
-    try:
-        i2c = SoftI2C(sda=Pin(config.I2C_SDA_PIN), scl=Pin(config.I2C_SCL_PIN), freq=100000)
-        devices = i2c.scan()
-        has_cardkb = CARDKB_ADDR in devices
-        has_oled = SSD1306_ADDR in devices
-        if has_cardkb:
-            print("CardKB detected at 0x5F")
-        if has_oled:
-            print("OLED detected at 0x3C")
-        return i2c, has_cardkb, has_oled
-    except Exception as e:
-        print("I2C init error:", e)
-        return None, False, False
-
-
 def init_oled(i2c):
     """Initialize SSD1306 OLED. Returns display object or None."""
     try:
         oled = SSD1306_I2C(128, 64, i2c, addr=SSD1306_ADDR)
         oled.poweroff()
-        return oled
     except Exception as e:
         print("OLED init error:", e)
         return None
+    _build()
+    return oled
+
+
+# ---------------------------------------------------------------------------
+# Dirty-Page OLED Output
+# Screens are still drawn into the RAM frame buffer, but only the SSD1306
+# pages (8-row bands of 128 column bytes) that differ from what the panel
+# already shows are sent, trimmed to the changed columns. This keeps the
+# shared I2C bus free for CardKB polling.
+# ---------------------------------------------------------------------------
+
+_PAGES = 8
+_PAGE_BYTES = 128
+_SET_COL_ADDR = 0x21
+_SET_PAGE_ADDR = 0x22
+
+# Copy of the panel's display RAM; invalid until the first full send
+_sent = bytearray(_PAGES * _PAGE_BYTES)
+_sent_valid = False
+
+# Frame buffer bytes sent since the menu opened
+bytes_sent = 0
+
+# Key to OLED latency: when the key being answered was read from the CardKB,
+# and the keys answered since the menu opened (count, total and worst ms)
+_key_ms = 0
+_key_waiting = False
+_answered = 0
+_answer_total = 0
+_answer_max = 0
+
+
+def _flush(oled):
+    """Send the changed columns of each changed page to the OLED."""
+    global _sent_valid, bytes_sent
+    buf = oled.buffer
+    if not _sent_valid:
+        oled.show()
+        _sent[:] = buf
+        _sent_valid = True
+        bytes_sent += len(buf)
+        _answer_key()
+        return
+    for page in range(_PAGES):
+        base = page * _PAGE_BYTES
+        start = base
+        end = base + _PAGE_BYTES
+        if buf[start:end] == _sent[start:end]:
+            continue
+        while buf[start] == _sent[start]:
+            start += 1
+        while buf[end - 1] == _sent[end - 1]:
+            end -= 1
+        oled.write_cmd(_SET_COL_ADDR)
+        oled.write_cmd(start - base)
+        oled.write_cmd(end - 1 - base)
+        oled.write_cmd(_SET_PAGE_ADDR)
+        oled.write_cmd(page)
+        oled.write_cmd(page)
+        oled.write_data(memoryview(buf)[start:end])
+        _sent[start:end] = buf[start:end]
+        bytes_sent += end - start
+    _answer_key()
+
+
+def _answer_key():
+    """The OLED now shows the response to the last key: record how long that took."""
+    global _key_waiting, _answered, _answer_total, _answer_max
+    if not _key_waiting:
+        return
+    _key_waiting = False
+    ms = time.ticks_diff(time.ticks_ms(), _key_ms)
+    telemetry.menu_key(ms)
+    _answered += 1
+    _answer_total += ms
+    if ms > _answer_max:
+        _answer_max = ms
+
+
+def _close(oled, settings, changed):
+    """Blank and power off the OLED when leaving the menu, then commit any changes."""
+    global _sent_valid
+    oled.fill(0)
+    _flush(oled)
+    oled.poweroff()
+    _sent_valid = False
+    print("Menu closed, OLED bytes sent:", bytes_sent, " key to OLED avg ms:",
+          _answer_total // _answered if _answered else 0, " max ms:", _answer_max)
+    if changed:
+        save_settings(settings)
 
 
 # ---------------------------------------------------------------------------
 # CardKB Input
 # ---------------------------------------------------------------------------
 
-def read_key(i2c):
-    """Non-blocking read from CardKB. Returns key code or 0."""
-    try:
-        data = i2c.readfrom(CARDKB_ADDR, 1)
-        return data[0]
-    except OSError:
-        return 0
+def _take_key():
+    """Next queued key, or 0. The next OLED flush counts as its response."""
+    global _key_ms, _key_waiting
+    key = get_key()
+    if key:
+        _key_ms = keys.key_ms
+        _key_waiting = True
+    return key
 
 
 def wait_for_key(i2c, ref_time):
     """Blocking wait for key press with timeout. Returns key code or None."""
     while True:
-        key = read_key(i2c)
+        supervisor.feed()
+        key = _take_key()
         if key != 0:
             return key
         if time.ticks_diff(time.ticks_ms(), ref_time) >= MENU_TIMEOUT_MS:
             return None
-        time.sleep_ms(50)
+        time.sleep_ms(MENU_POLL_MS)
 
 
 # ---------------------------------------------------------------------------
@@ -209,72 +265,43 @@ def _format_field_value(field_key, value):
     return _truncate(value, 10)
 
 
-def render_screen(oled, title, items, selected_idx, checked_idx, scroll_offset, page_str):
-    """Render a full menu screen to the OLED."""
+def render_screen(oled, screen, selected_idx, scroll_offset):
+    """Draw a menu screen from its cached labels and send the pages that changed."""
     oled.fill(0)
 
     # Yellow zone: title (row 0) and page indicator (row 0, right-aligned)
-    oled.text(title, 0, 4, 1)
-    page_x = 128 - len(page_str) * 8
-    oled.text(page_str, page_x, 4, 1)
+    oled.text(screen["title"], 0, 4, 1)
+    page_str = screen["page"]
+    oled.text(page_str, 128 - len(page_str) * 8, 4, 1)
 
     # Separator line at boundary of yellow/blue zone
     oled.hline(0, 15, 128, 1)
 
     # Blue zone: menu items (rows 18-55, up to 5 items)
-    max_visible = 5
-    for i in range(max_visible):
+    labels = screen["labels"]
+    checked_idx = screen["checked"]
+    for i in range(_VISIBLE):
         item_idx = scroll_offset + i
-        if item_idx >= len(items):
+        if item_idx >= len(labels):
             break
-        y = 18 + (i * 8)
-
-        # Build prefix
-        if item_idx == selected_idx and item_idx == checked_idx:
-            prefix = ">"
-            suffix = " *"
-        elif item_idx == selected_idx:
-            prefix = ">"
-            suffix = ""
-        elif item_idx == checked_idx:
-            prefix = " "
-            suffix = " *"
-        else:
-            prefix = " "
-            suffix = ""
+        if item_idx != selected_idx:
+            oled.text(labels[item_idx][_CHECKED if item_idx == checked_idx else 0], 0, 18 + i * 8, 1)
 
-        label = prefix + items[item_idx]
-        # Truncate to fit with possible suffix
-        max_chars = 16 - len(suffix)
-        label = _truncate(label, max_chars) + suffix
-        oled.text(label, 0, y, 1)
-
-    # Highlight bar behind selected item (invert)
+    # Highlight bar behind selected item, its text inverted (color=0 on white)
     vis_selected = selected_idx - scroll_offset
-    if 0 <= vis_selected < max_visible:
-        hy = 17 + (vis_selected * 8)
-        oled.fill_rect(0, hy, 128, 9, 1)
-        # Redraw that item's text inverted (color=0 on white background)
-        item_idx = selected_idx
-        if item_idx < len(items):
-            if item_idx == checked_idx:
-                prefix = ">"
-                suffix = " *"
-            else:
-                prefix = ">"
-                suffix = ""
-            label = prefix + items[item_idx]
-            max_chars = 16 - len(suffix)
-            label = _truncate(label, max_chars) + suffix
-            oled.text(label, 0, 18 + (vis_selected * 8), 0)
+    if 0 <= vis_selected < _VISIBLE:
+        oled.fill_rect(0, 17 + vis_selected * 8, 128, 9, 1)
+        if selected_idx < len(labels):
+            variant = _SELECTED + (_CHECKED if selected_idx == checked_idx else 0)
+            oled.text(labels[selected_idx][variant], 0, 18 + vis_selected * 8, 0)
 
     # Bottom bar: navigation hint
     oled.text("<L  UP/DN  R>", 8, 56, 1)
 
-    oled.show()
+    _flush(oled)
 
 
-def compute_scroll_offset(selected_idx, num_items, max_visible=5):
+def compute_scroll_offset(selected_idx, num_items, max_visible=_VISIBLE):
     """Compute scroll offset to keep selected item visible."""
     if num_items <= max_visible:
         return 0
@@ -294,6 +321,100 @@ def _get_checked_index(screen, settings):
     return -1
 
 
+def _topic_items(selected):
+    """"All topics" and each fetched topic, marked [x] when shown."""
+    items = [("[x] " if not selected else "[ ] ") + "All topics"]
+    for i in range(len(factstore.topic_ids)):
+        shown = not selected or factstore.topic_ids[i] in selected
+        items.append(("[x] " if shown else "[ ] ") + factstore.topic_names[i])
+    return items
+
+
+def _toggle_topic(selected, i):
+    """New topic selection with topic i toggled (i = -1 shows all topics)."""
+    ids = factstore.topic_ids
+    if i < 0:
+        return []
+    current = list(selected) if selected else list(ids)
+    tid = ids[i]
+    if tid in current:
+        if len(current) == 1:
+            return selected  # at least one topic stays shown
+        current.remove(tid)
+    else:
+        current.append(tid)
+    for t in ids:
+        if t not in current:
+            return current
+    return []
+
+
+# ---------------------------------------------------------------------------
+# Menu Model
+# The screens are compiled once, when the OLED is found: each gets its page
+# indicator, its type's fill and enter functions, and every row label
+# pre-rendered in the four forms a row can be drawn in. Option labels never
+# change; labels that show settings (topics, fields, current scroll speed)
+# and the checked option are refilled when the menu opens and after a
+# change, not on every key.
+# ---------------------------------------------------------------------------
+
+# Row label forms, indexed by selected + checked
+_SELECTED = 1
+_CHECKED = 2
+
+# Per screen: selected row and scroll offset
+_selected = None
+_offsets = None
+
+
+def _row_labels(text):
+    """The four ways a row is drawn: plain, selected, checked, selected and checked."""
+    return (_truncate(" " + text, 16), _truncate(">" + text, 16),
+            _truncate(" " + text, 14) + " *", _truncate(">" + text, 14) + " *")
+
+
+def _fill_select(screen, settings):
+    screen["checked"] = _get_checked_index(screen, settings)
+
+
+def _fill_topics(screen, settings):
+    screen["labels"] = [_row_labels(item) for item in _topic_items(settings.get("topics"))]
+
+
+def _fill_number(screen, settings):
+    cur = settings.get(screen["key"], "")
+    screen["labels"] = [_row_labels("Current: " + str(cur) + screen.get("unit", "")),
+                        _row_labels("Edit value")]
+
+
+def _fill_fields(screen, settings):
+    labels = []
+    for label, key in screen["fields"]:
+        labels.append(_row_labels(label + ":" + _format_field_value(key, settings.get(key, ""))))
+    screen["labels"] = labels
+
+
+def _build():
+    """Compile the screens into the menu model."""
+    global SCREENS, _selected, _offsets
+    SCREENS = _screen_defs()
+    count = len(SCREENS)
+    for i in range(count):
+        screen = SCREENS[i]
+        fill, enter = _TYPES[screen["type"]]
+        screen["page"] = str(i + 1) + "/" + str(count)
+        screen["fill"] = fill
+        screen["enter"] = enter
+        screen["checked"] = -1
+        if screen["type"] == "select":
+            screen["labels"] = [_row_labels(opt[0]) for opt in screen["options"]]
+        else:
+            screen["labels"] = []
+    _selected = array("H", [0] * count)
+    _offsets = array("H", [0] * count)
+
+
 # ---------------------------------------------------------------------------
 # Confirmation Dialog
 # ---------------------------------------------------------------------------
@@ -301,27 +422,31 @@ def _get_checked_index(screen, settings):
 def _confirm_dialog(oled, i2c):
     """Show 'ARE YOU SURE?' dialog. Returns True for YES, False for NO."""
     selected = 0
+    drawn = -1
     last_activity = time.ticks_ms()
 
     while True:
         if time.ticks_diff(time.ticks_ms(), last_activity) >= MENU_TIMEOUT_MS:
             return False
 
-        oled.fill(0)
-        oled.text("ARE YOU SURE", 16, 4, 1)
-        oled.text("YOU WANT TO", 20, 14, 1)
-        oled.text("CHANGE THIS?", 16, 24, 1)
+        if selected != drawn:
+            oled.fill(0)
+            oled.text("ARE YOU SURE", 16, 4, 1)
+            oled.text("YOU WANT TO", 20, 14, 1)
+            oled.text("CHANGE THIS?", 16, 24, 1)
 
-        yes_prefix = "> " if selected == 0 else "  "
-        no_prefix = "> " if selected == 1 else "  "
-        oled.text(yes_prefix + "YES", 40, 40, 1)
-        oled.text(no_prefix + "NO", 40, 50, 1)
+            yes_prefix = "> " if selected == 0 else "  "
+            no_prefix = "> " if selected == 1 else "  "
+            oled.text(yes_prefix + "YES", 40, 40, 1)
+            oled.text(no_prefix + "NO", 40, 50, 1)
 
-        oled.show()
+            _flush(oled)
+            drawn = selected
 
-        key = read_key(i2c)
+        supervisor.feed()
+        key = _take_key()
         if key == 0:
-            time.sleep_ms(50)
+            time.sleep_ms(MENU_POLL_MS)
             continue
 
         last_activity = time.ticks_ms()
@@ -342,17 +467,13 @@ def _text_entry_flow(oled, i2c, field_label, current_value):
     """Text entry dialog. Returns new string if confirmed, None if cancelled."""
     buf = list(current_value)
     cursor = len(buf)
+    drawn = None
     last_activity = time.ticks_ms()
 
     while True:
         if time.ticks_diff(time.ticks_ms(), last_activity) >= MENU_TIMEOUT_MS:
             return None
 
-        oled.fill(0)
-        oled.text("EDIT:", 0, 0, 1)
-        oled.text(_truncate(field_label, 16), 0, 10, 1)
-        oled.hline(0, 19, 128, 1)
-
         # Show text with sliding window around cursor
         text_str = "".join(buf)
         visible = 16
@@ -364,20 +485,30 @@ def _text_entry_flow(oled, i2c, field_label, current_value):
             win_end = win_start + visible
             display_str = text_str[win_start:win_end]
             cursor_x = (cursor - win_start) * 8
+        blink = (time.ticks_ms() // 400) % 2
 
-        oled.text(display_str, 0, 24, 1)
-
-        # Blinking cursor underline
-        if (time.ticks_ms() // 400) % 2:
-            oled.hline(cursor_x, 33, 7, 1)
-
-        oled.text("ENT=OK", 0, 48, 1)
-        oled.text("ESC=CANCEL", 0, 56, 1)
-        oled.show()
-
-        key = read_key(i2c)
+        # Redraw only when the text, cursor or blink phase changed
+        view = (display_str, cursor_x, blink)
+        if view != drawn:
+            oled.fill(0)
+            oled.text("EDIT:", 0, 0, 1)
+            oled.text(_truncate(field_label, 16), 0, 10, 1)
+            oled.hline(0, 19, 128, 1)
+            oled.text(display_str, 0, 24, 1)
+
+            # Blinking cursor underline
+            if blink:
+                oled.hline(cursor_x, 33, 7, 1)
+
+            oled.text("ENT=OK", 0, 48, 1)
+            oled.text("ESC=CANCEL", 0, 56, 1)
+            _flush(oled)
+            drawn = view
+
+        supervisor.feed()
+        key = _take_key()
         if key == 0:
-            time.sleep_ms(50)
+            time.sleep_ms(MENU_POLL_MS)
             continue
 
         last_activity = time.ticks_ms()
@@ -417,36 +548,44 @@ def _number_entry_flow(oled, i2c, current_value, min_val, max_val, unit):
     buf = list(str(current_value))
     cursor = len(buf)
     error_msg = ""
+    drawn = None
     last_activity = time.ticks_ms()
 
     while True:
         if time.ticks_diff(time.ticks_ms(), last_activity) >= MENU_TIMEOUT_MS:
             return None
 
-        oled.fill(0)
-        oled.text("SCROLL SPEED", 0, 0, 1)
-        oled.text(str(min_val) + "-" + str(max_val) + unit, 0, 10, 1)
-        oled.hline(0, 19, 128, 1)
-
-        # Show current input
         text_str = "".join(buf)
-        oled.text(text_str + unit, 0, 24, 1)
+        blink = (time.ticks_ms() // 400) % 2
 
-        # Blinking cursor underline
-        if (time.ticks_ms() // 400) % 2:
-            cx = cursor * 8
-            oled.hline(cx, 33, 7, 1)
+        # Redraw only when the input, cursor, blink phase or error changed
+        view = (text_str, cursor, blink, error_msg)
+        if view != drawn:
+            oled.fill(0)
+            oled.text("SCROLL SPEED", 0, 0, 1)
+            oled.text(str(min_val) + "-" + str(max_val) + unit, 0, 10, 1)
+            oled.hline(0, 19, 128, 1)
 
-        if error_msg:
-            oled.text(error_msg, 0, 40, 1)
+            # Show current input
+            oled.text(text_str + unit, 0, 24, 1)
 
-        oled.text("ENT=OK", 0, 48, 1)
-        oled.text("ESC=CANCEL", 0, 56, 1)
-        oled.show()
+            # Blinking cursor underline
+            if blink:
+                cx = cursor * 8
+                oled.hline(cx, 33, 7, 1)
+
+            if error_msg:
+                oled.text(error_msg, 0, 40, 1)
+
+            oled.text("ENT=OK", 0, 48, 1)
+            oled.text("ESC=CANCEL", 0, 56, 1)
+            _flush(oled)
+            drawn = view
 
-        key = read_key(i2c)
+        supervisor.feed()
+        key = _take_key()
         if key == 0:
-            time.sleep_ms(50)
+            time.sleep_ms(MENU_POLL_MS)
             continue
 
         last_activity = time.ticks_ms()
@@ -487,104 +626,156 @@ def _number_entry_flow(oled, i2c, current_value, min_val, max_val, unit):
 # Main Settings Menu
 # ---------------------------------------------------------------------------
 
+def _show_set(oled):
+    """Brief "Set!" feedback in the bottom bar."""
+    oled.fill_rect(0, 56, 128, 8, 0)
+    oled.text("   Set!", 32, 56, 1)
+    _flush(oled)
+    time.sleep_ms(500)
+
+
+# Enter on each screen type: (oled, i2c, settings, screen, selected row),
+# returning True if a setting changed
+
+def _enter_select(oled, i2c, settings, screen, row):
+    settings[screen["key"]] = screen["options"][row][1]
+    _show_set(oled)
+    return True
+
+
+def _enter_topics(oled, i2c, settings, screen, row):
+    # A new list, so the saved copy still differs
+    settings["topics"] = _toggle_topic(settings.get("topics"), row - 1)
+    return True
+
+
+def _enter_text(oled, i2c, settings, screen, row):
+    field_label, field_key = screen["fields"][row]
+    result = _text_entry_flow(oled, i2c, field_label, settings.get(field_key, ""))
+    if result is None:
+        return False
+    settings[field_key] = result
+    return True
+
+
+def _enter_number(oled, i2c, settings, screen, row):
+    cur = settings.get(screen["key"], 80)
+    result = _number_entry_flow(oled, i2c, cur, screen["min"], screen["max"], screen.get("unit", ""))
+    if result is None:
+        return False
+    settings[screen["key"]] = result
+    _show_set(oled)
+    return True
+
+
+# Screen type -> (fill labels, enter)
+_TYPES = {
+    "select": (_fill_select, _enter_select),
+    "topics": (_fill_topics, _enter_topics),
+    "text_entry": (_fill_fields, _enter_text),
+    "number_entry": (_fill_number, _enter_number),
+}
+
+# Menu state while open
+_screen_idx = 0
+_changed = False
+
+
+# Key actions: (oled, i2c, settings), returning True to close the menu
+
+def _key_left(oled, i2c, settings):
+    global _screen_idx
+    _screen_idx = (_screen_idx - 1) % len(SCREENS)
+
+
+def _key_right(oled, i2c, settings):
+    global _screen_idx
+    _screen_idx = (_screen_idx + 1) % len(SCREENS)
+
+
+def _move(step):
+    """Move the selection of the current screen by step rows."""
+    i = _screen_idx
+    count = len(SCREENS[i]["labels"])
+    row = max(0, min(count - 1, _selected[i] + step))
+    _selected[i] = row
+    _offsets[i] = compute_scroll_offset(row, count)
+
+
+def _key_up(oled, i2c, settings):
+    _move(-1)
+
+
+def _key_down(oled, i2c, settings):
+    _move(1)
+
+
+def _key_enter(oled, i2c, settings):
+    global _changed
+    screen = SCREENS[_screen_idx]
+    if screen["enter"](oled, i2c, settings, screen, _selected[_screen_idx]):
+        _changed = True
+        screen["fill"](screen, settings)
+
+
+def _key_esc(oled, i2c, settings):
+    return True
+
+
+_KEY_ACTIONS = {
+    KEY_LEFT: _key_left,
+    KEY_RIGHT: _key_right,
+    KEY_UP: _key_up,
+    KEY_DOWN: _key_down,
+    KEY_ENTER: _key_enter,
+    KEY_ESC: _key_esc,
+}
+
+
+def prepare(settings):
+    """Reset the menu to its first screen and fill the labels from settings."""
+    global _screen_idx, _changed
+    if SCREENS is None:
+        _build()
+    _changed = False
+    _screen_idx = 0
+    for i in range(len(SCREENS)):
+        _selected[i] = 0
+        _offsets[i] = 0
+        SCREENS[i]["fill"](SCREENS[i], settings)
+
+
+def press(oled, i2c, settings, key):
+    """Act on a key, then draw the screen. Returns True if the key closes the menu."""
+    action = _KEY_ACTIONS.get(key)
+    if action is not None and action(oled, i2c, settings):
+        return True
+    render_screen(oled, SCREENS[_screen_idx], _selected[_screen_idx], _offsets[_screen_idx])
+    return False
+
+
 def open_settings_menu(oled, i2c, settings):
     """
     Main settings menu loop.
     Returns True if any settings were changed, False otherwise.
-    Powers off OLED on exit.
+    Changes are saved once, when the menu closes. Powers off OLED on exit.
     """
+    global bytes_sent, _sent_valid, _answered, _answer_total, _answer_max
     oled.poweron()
     time.sleep_ms(50)
-    changed = False
-    screen_idx = 0
-    selected = [0] * len(SCREENS)
+    _sent_valid = False  # send the first screen whole (bench menu draws without a panel)
+    bytes_sent = 0
+    _answered = _answer_total = _answer_max = 0
+    prepare(settings)
+    render_screen(oled, SCREENS[0], 0, 0)
     last_activity = time.ticks_ms()
 
     while True:
-        # Check inactivity timeout
-        if time.ticks_diff(time.ticks_ms(), last_activity) >= MENU_TIMEOUT_MS:
-            oled.fill(0)
-            oled.show()
-            oled.poweroff()
-            return changed
-
-        screen = SCREENS[screen_idx]
-        page_str = str(screen_idx + 1) + "/" + str(len(SCREENS))
-
-        # Build item list and find checked index
-        if screen["type"] == "select":
-            items = [opt[0] for opt in screen["options"]]
-            checked_idx = _get_checked_index(screen, settings)
-        elif screen["type"] == "number_entry":
-            cur = settings.get(screen["key"], "")
-            items = ["Current: " + str(cur) + screen.get("unit", ""), "Edit value"]
-            checked_idx = -1
-        else:
-            items = []
-            for label, key in screen["fields"]:
-                val = _format_field_value(key, settings.get(key, ""))
-                items.append(label + ":" + val)
-            checked_idx = -1
-
-        num_items = len(items)
-        scroll_off = compute_scroll_offset(selected[screen_idx], num_items)
-
-        render_screen(oled, screen["title"], items, selected[screen_idx], checked_idx, scroll_off, page_str)
-
-        # Wait for key
+        # Wait for key (None after MENU_TIMEOUT_MS without one)
         key = wait_for_key(i2c, last_activity)
-
-        if key is None:
-            oled.fill(0)
-            oled.show()
-            oled.poweroff()
-            return changed
-
+        if key is None or press(oled, i2c, settings, key):
+            break
         last_activity = time.ticks_ms()
 
-        # Navigation
-        if key == KEY_LEFT:
-            screen_idx = (screen_idx - 1) % len(SCREENS)
-        elif key == KEY_RIGHT:
-            screen_idx = (screen_idx + 1) % len(SCREENS)
-        elif key == KEY_UP:
-            selected[screen_idx] = max(0, selected[screen_idx] - 1)
-        elif key == KEY_DOWN:
-            selected[screen_idx] = min(num_items - 1, selected[screen_idx] + 1)
-        elif key == KEY_ENTER:
-            if screen["type"] == "select":
-                value = screen["options"][selected[screen_idx]][1]
-                settings[screen["key"]] = value
-                save_settings(settings)
-                changed = True
-                # Brief visual feedback
-                oled.fill_rect(0, 56, 128, 8, 0)
-                oled.text("  Saved!", 32, 56, 1)
-                oled.show()
-                time.sleep_ms(500)
-            elif screen["type"] == "text_entry":
-                field_label, field_key = screen["fields"][selected[screen_idx]]
-                current_val = settings.get(field_key, "")
-                result = _text_entry_flow(oled, i2c, field_label, current_val)
-                if result is not None:
-                    settings[field_key] = result
-                    save_settings(settings)
-                    changed = True
-                last_activity = time.ticks_ms()
-            elif screen["type"] == "number_entry":
-                cur = settings.get(screen["key"], 80)
-                result = _number_entry_flow(oled, i2c, cur, screen["min"], screen["max"], screen.get("unit", ""))
-                if result is not None:
-                    settings[screen["key"]] = result
-                    save_settings(settings)
-                    changed = True
-                    oled.fill_rect(0, 56, 128, 8, 0)
-                    oled.text("  Saved!", 32, 56, 1)
-                    oled.show()
-                    time.sleep_ms(500)
-                last_activity = time.ticks_ms()
-        elif key == KEY_ESC:
-            oled.fill(0)
-            oled.show()
-            oled.poweroff()
-            return changed
+    _close(oled, settings, _changed)
+    return _changed
@@ -0,0 +1,161 @@
+"""Build the extended font files (.kfx) used by glyphs.py.
+
+Run on a computer (python3 mkfont.py) or on the board (import mkfont;
+mkfont.build()), then upload font_large.kfx and font_small.kfx.
+"""
+import struct
+
+from fonts import FONT_START, FONT_DATA, FONT_SMALL_DATA
+from glyphs import MAGIC, HEADER, TRANSLIT_LEN, FONT_FILES
+
+# ---------------------------------------------------------------------------
+# Accent Marks
+# Drawn in the rows above the lowercase x-height and ORed onto a base letter.
+# Column-encoded like fonts.py: bit 0 = top row.
+# ---------------------------------------------------------------------------
+ACCENTS_LARGE = {
+    "grave": b"\x00\x01\x02\x00\x00",
+    "acute": b"\x00\x00\x02\x01\x00",
+    "circumflex": b"\x00\x02\x01\x02\x00",
+    "tilde": b"\x00\x02\x01\x02\x01",
+    "diaeresis": b"\x00\x01\x00\x01\x00",
+    "ring": b"\x00\x00\x03\x03\x00",
+    "cedilla": b"\x00\x00\x80\x80\x00",
+}
+
+ACCENTS_SMALL = {
+    "grave": b"\x01\x02\x00",
+    "acute": b"\x00\x02\x01",
+    "circumflex": b"\x02\x01\x02",
+    "tilde": b"\x01\x02\x01",
+    "diaeresis": b"\x02\x00\x02",
+    "ring": b"\x00\x02\x00",
+    "cedilla": b"\x00\x40\x00",
+}
+
+# Dotless i bases (the ASCII 'i' glyph carries its dot in the accent rows)
+DOTLESS_I_LARGE = b"\x00\x44\x7C\x40\x00"
+DOTLESS_I_SMALL = b"\x38\x00\x00"
+
+# Lowercase Latin-1 letters composed from base letter + accent
+COMPOSED = [
+    (0x00E0, "a", "grave"), (0x00E1, "a", "acute"), (0x00E2, "a", "circumflex"),
+    (0x00E3, "a", "tilde"), (0x00E4, "a", "diaeresis"), (0x00E5, "a", "ring"),
+    (0x00E7, "c", "cedilla"),
+    (0x00E8, "e", "grave"), (0x00E9, "e", "acute"), (0x00EA, "e", "circumflex"),
+    (0x00EB, "e", "diaeresis"),
+    (0x00EC, "i", "grave"), (0x00ED, "i", "acute"), (0x00EE, "i", "circumflex"),
+    (0x00EF, "i", "diaeresis"),
+    (0x00F1, "n", "tilde"),
+    (0x00F2, "o", "grave"), (0x00F3, "o", "acute"), (0x00F4, "o", "circumflex"),
+    (0x00F5, "o", "tilde"), (0x00F6, "o", "diaeresis"),
+    (0x00F9, "u", "grave"), (0x00FA, "u", "acute"), (0x00FB, "u", "circumflex"),
+    (0x00FC, "u", "diaeresis"),
+    (0x00FD, "y", "acute"), (0x00FF, "y", "diaeresis"),
+]
+
+# ---------------------------------------------------------------------------
+# Symbols
+# ---------------------------------------------------------------------------
+SYMBOLS_LARGE = {
+    0x00A1: b"\x00\x00\x7D\x00\x00",  # inverted !
+    0x00A2: b"\x18\x24\x7E\x24\x24",  # cent
+    0x00A3: b"\x48\x7E\x49\x41\x42",  # pound
+    0x00B0: b"\x00\x06\x09\x09\x06",  # degree
+    0x00B1: b"\x44\x44\x5F\x44\x44",  # plus-minus
+    0x00B5: b"\xFC\x40\x40\x20\x7C",  # micro
+    0x00B7: b"\x00\x00\x08\x00\x00",  # middle dot
+    0x00BF: b"\x30\x48\x4D\x40\x20",  # inverted ?
+    0x00D7: b"\x22\x14\x08\x14\x22",  # multiplication
+    0x00F7: b"\x08\x08\x2A\x08\x08",  # division
+    0x2022: b"\x00\x1C\x1C\x1C\x00",  # bullet
+    0x2026: b"\x40\x00\x40\x00\x40",  # ellipsis
+    0x20AC: b"\x14\x3E\x55\x41\x22",  # euro
+}
+
+SYMBOLS_SMALL = {
+    0x00B0: b"\x07\x05\x07",  # degree
+    0x00B1: b"\x24\x2E\x24",  # plus-minus
+    0x00B7: b"\x00\x08\x00",  # middle dot
+    0x00D7: b"\x14\x08\x14",  # multiplication
+    0x00F7: b"\x08\x2A\x08",  # division
+    0x2022: b"\x1C\x1C\x1C",  # bullet
+    0x2026: b"\x20\x00\x20",  # ellipsis
+    0x20AC: b"\x1C\x3E\x2A",  # euro
+}
+
+# ---------------------------------------------------------------------------
+# Transliteration Fallbacks (used when a font has no glyph)
+# ---------------------------------------------------------------------------
+TRANSLIT = {
+    0x00A0: " ", 0x00A1: "!", 0x00A2: "c", 0x00A3: "L", 0x00A5: "Y", 0x00A7: "S",
+    0x00A9: "(c)", 0x00AB: "<<", 0x00AD: "-", 0x00AE: "(R)", 0x00B0: "o", 0x00B1: "+-",
+    0x00B2: "2", 0x00B3: "3", 0x00B5: "u", 0x00B6: "P", 0x00B7: ".", 0x00B9: "1",
+    0x00BB: ">>", 0x00BC: "1/4", 0x00BD: "1/2", 0x00BE: "3/4", 0x00BF: "?",
+    0x00C6: "AE", 0x00C7: "C", 0x00D0: "D", 0x00D1: "N", 0x00D7: "x", 0x00D8: "O",
+    0x00DD: "Y", 0x00DE: "TH", 0x00DF: "ss", 0x00E6: "ae", 0x00E7: "c", 0x00F0: "d",
+    0x00F1: "n", 0x00F7: "/", 0x00F8: "o", 0x00FD: "y", 0x00FE: "th", 0x00FF: "y",
+    0x0101: "a", 0x0105: "a", 0x0106: "C", 0x0107: "c", 0x010C: "C", 0x010D: "c",
+    0x0113: "e", 0x0119: "e", 0x011B: "e", 0x011F: "g", 0x012B: "i", 0x0131: "i",
+    0x0141: "L", 0x0142: "l", 0x0144: "n", 0x014D: "o", 0x0151: "o", 0x0152: "OE",
+    0x0153: "oe", 0x0158: "R", 0x0159: "r", 0x015A: "S", 0x015B: "s", 0x015E: "S",
+    0x015F: "s", 0x0160: "S", 0x0161: "s", 0x016B: "u", 0x0171: "u", 0x0178: "Y",
+    0x0179: "Z", 0x017A: "z", 0x017B: "Z", 0x017C: "z", 0x017D: "Z", 0x017E: "z",
+    0x2002: " ", 0x2003: " ", 0x2009: " ", 0x200A: " ",
+    0x2010: "-", 0x2011: "-", 0x2012: "-", 0x2013: "-", 0x2014: "-", 0x2015: "-",
+    0x2018: "'", 0x2019: "'", 0x201A: ",", 0x201B: "'",
+    0x201C: "\"", 0x201D: "\"", 0x201E: "\"", 0x2022: "*", 0x2026: "...",
+    0x2030: "%", 0x2032: "'", 0x2033: "\"", 0x2039: "<", 0x203A: ">", 0x2044: "/",
+    0x20AC: "EUR", 0x2122: "TM", 0x2190: "<-", 0x2192: "->", 0x2212: "-",
+    0x2248: "~", 0x2260: "!=", 0x2264: "<=", 0x2265: ">=",
+}
+
+# Uppercase and remaining lowercase Latin-1 letters fall back to the base letter
+for _base, _first in (("A", 0xC0), ("E", 0xC8), ("I", 0xCC), ("O", 0xD2), ("U", 0xD9)):
+    _count = 6 if _base == "A" else (5 if _base == "O" else 4)
+    for _i in range(_count):
+        TRANSLIT.setdefault(_first + _i, _base)
+        TRANSLIT.setdefault(_first + 0x20 + _i, _base.lower())
+
+
+def _ascii_glyph(font, width, char):
+    offset = (ord(char) - FONT_START) * width
+    return font[offset:offset + width]
+
+
+def _glyph_table(font, width, accents, dotless_i, symbols):
+    glyphs = dict(symbols)
+    for code, base, accent in COMPOSED:
+        base_glyph = dotless_i if base == "i" else _ascii_glyph(font, width, base)
+        mark = accents[accent]
+        glyphs[code] = bytes(base_glyph[c] | mark[c] for c in range(width))
+    return glyphs
+
+
+def _write(path, width, glyphs):
+    glyph_codes = sorted(glyphs)
+    translit_codes = sorted(TRANSLIT)
+    with open(path, "wb") as f:
+        f.write(struct.pack(HEADER, MAGIC, width, len(glyph_codes), len(translit_codes)))
+        for code in glyph_codes:
+            f.write(struct.pack("<H", code))
+        for code in glyph_codes:
+            f.write(glyphs[code])
+        for code in translit_codes:
+            f.write(struct.pack("<H", code))
+        for code in translit_codes:
+            text = TRANSLIT[code].encode()
+            f.write(text + bytes(TRANSLIT_LEN - len(text)))
+    print("Wrote", path + ":", len(glyph_codes), "glyphs,", len(translit_codes), "fallbacks")
+
+
+def build():
+    """Write font_large.kfx and font_small.kfx to the current directory."""
+    _write(FONT_FILES["large"], 5,
+           _glyph_table(FONT_DATA, 5, ACCENTS_LARGE, DOTLESS_I_LARGE, SYMBOLS_LARGE))
+    _write(FONT_FILES["small"], 3,
+           _glyph_table(FONT_SMALL_DATA, 3, ACCENTS_SMALL, DOTLESS_I_SMALL, SYMBOLS_SMALL))
+
+
+if __name__ == "__main__":
+    build()
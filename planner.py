@@ -0,0 +1,166 @@
+import gc
+import time
+from array import array
+
+import config
+import telemetry
+
+try:
+    from micropython import const
+except ImportError:
+    def const(x):
+        return x
+
+# ---------------------------------------------------------------------------
+# Fact Boundary Planner
+# Fetches, telemetry saves and garbage collections block the display, so
+# they run between facts. Before each fact the planner predicts when it
+# will end: its frame count times the scroll delay, plus the per-frame
+# overhead (render, key poll) measured on earlier facts. A job that falls
+# due during the next fact runs at this boundary if it is closer to the due
+# time than the end of the fact is, and otherwise at that end. A long fact
+# then moves a job by at most half its length, early or late.
+# ---------------------------------------------------------------------------
+
+REFRESH = const(0)
+FLUSH = const(1)
+_NUM_JOBS = const(2)
+_JOB_NAMES = ("refresh", "telemetry save")
+
+_interval = (config.FACT_REFRESH_INTERVAL_MS, config.TELEMETRY_SAVE_MS)
+_due = array("L", [0] * _NUM_JOBS)
+
+# Per job: runs, total |actual - due| ms, latest early and late ms, runs
+# more than one interval late (quiet hours, failed WiFi: not in the average)
+_RUNS = const(0)
+_ERR_TOTAL = const(1)
+_EARLY_MAX = const(2)
+_LATE_MAX = const(3)
+_MISSED = const(4)
+_JOB_SLOTS = const(5)
+_job_stats = array("L", [0] * (_JOB_SLOTS * _NUM_JOBS))
+
+# Fact end prediction: frame overhead learnt so far (us), the fact showing
+# now, and how far actual ends were from the predicted ones
+_frame_extra_us = 0
+_fact_start = 0
+_fact_frames = 0
+_fact_predicted = 0
+facts = 0
+_fact_err_total = 0
+fact_err_max = 0
+
+# Heap used from one boundary's collection check to the next (bytes)
+_alloc = 0
+_free_after = 0
+
+
+def init():
+    """Start every job's interval now (after the first fetch)."""
+    now = time.ticks_ms()
+    for job in range(_NUM_JOBS):
+        _due[job] = time.ticks_add(now, _interval[job])
+
+
+def predict_ms(frames, delay, fixed_ms=0):
+    """How long frames frames take at delay ms each, plus fixed_ms."""
+    return fixed_ms + frames * delay + frames * _frame_extra_us // 1000
+
+
+def ms_until(job):
+    """ms until a job is due (negative when overdue)."""
+    return time.ticks_diff(_due[job], time.ticks_ms())
+
+
+def due(job, next_fact_ms):
+    """True if a job should run now rather than after a fact of next_fact_ms."""
+    left = ms_until(job)
+    return left <= 0 or left < next_fact_ms - left
+
+
+def ran(job, planned=True):
+    """Record that a job ran (whether or not it succeeded) and schedule the next run.
+
+    An unplanned run (a refresh forced from the console or the menu) starts
+    a new interval and is not counted.
+    """
+    now = time.ticks_ms()
+    if not planned:
+        _due[job] = time.ticks_add(now, _interval[job])
+        return
+    err = time.ticks_diff(now, _due[job])
+    s = job * _JOB_SLOTS
+    if err >= _interval[job]:
+        _job_stats[s + _MISSED] += 1
+    else:
+        _job_stats[s + _RUNS] += 1
+        _job_stats[s + _ERR_TOTAL] += abs(err)
+        if err < 0 and -err > _job_stats[s + _EARLY_MAX]:
+            _job_stats[s + _EARLY_MAX] = -err
+        if err > _job_stats[s + _LATE_MAX]:
+            _job_stats[s + _LATE_MAX] = err
+    # Keep the cadence, unless the job is so late the next run is past due too
+    next_due = time.ticks_add(_due[job], _interval[job])
+    if time.ticks_diff(next_due, now) <= 0:
+        next_due = time.ticks_add(now, _interval[job])
+    _due[job] = next_due
+
+
+def begin_fact(frames, delay, fixed_ms=0):
+    """Note the start of a fact of frames frames. Returns its predicted length in ms."""
+    global _fact_start, _fact_frames, _fact_predicted
+    _fact_frames = frames
+    _fact_predicted = predict_ms(frames, delay, fixed_ms)
+    _fact_start = time.ticks_ms()
+    return _fact_predicted
+
+
+def end_fact(completed):
+    """Compare the fact's end with the prediction and learn the frame overhead.
+
+    A fact cut short by a key press says nothing about timing and is skipped.
+    """
+    global facts, _fact_err_total, fact_err_max, _frame_extra_us
+    if not completed or not _fact_frames:
+        return
+    actual = time.ticks_diff(time.ticks_ms(), _fact_start)
+    err = actual - _fact_predicted
+    facts += 1
+    _fact_err_total += abs(err)
+    if abs(err) > abs(fact_err_max):
+        fact_err_max = err
+    # Move a quarter of the way to this fact's overhead per frame
+    extra = _frame_extra_us + err * 1000 // _fact_frames
+    _frame_extra_us = max(0, _frame_extra_us + (extra - _frame_extra_us) // 4)
+
+
+def collect():
+    """Collect at this boundary if the next one would leave less than GC_HEADROOM_KB free.
+
+    The heap used between boundaries (the next fact's columns, console and
+    key buffers) is measured, so the collection runs here rather than as a
+    gc.threshold collection in the middle of the next scroll.
+    """
+    global _alloc, _free_after
+    free = gc.mem_free()
+    used = _free_after - free
+    if 0 < used:
+        _alloc = used if not _alloc else (3 * _alloc + used) // 4
+    ran_gc = telemetry.collect_if_low(_alloc)
+    _free_after = gc.mem_free() if ran_gc else free
+    return ran_gc
+
+
+def report():
+    """Print how far fact ends and jobs ran from their predicted and due times."""
+    print("--- planner ---")
+    print("fact ends:", facts, " avg error ms:", _fact_err_total // facts if facts else 0,
+          " worst ms:", fact_err_max, " frame overhead us:", _frame_extra_us)
+    for job in range(_NUM_JOBS):
+        s = job * _JOB_SLOTS
+        runs = _job_stats[s + _RUNS]
+        print(_JOB_NAMES[job] + ":", runs, "runs, avg ms from due:",
+              _job_stats[s + _ERR_TOTAL] // runs if runs else 0,
+              " max early:", _job_stats[s + _EARLY_MAX], " max late:", _job_stats[s + _LATE_MAX],
+              " missed:", _job_stats[s + _MISSED], " next in s:", ms_until(job) // 1000)
+    print("heap used per fact:", _alloc)
@@ -0,0 +1,135 @@
+from array import array
+
+import config
+
+try:
+    from micropython import const
+except ImportError:
+    def const(x):
+        return x
+
+# ---------------------------------------------------------------------------
+# LED Power Estimation
+# WS2812B current is close to linear in each channel's PWM value, so a frame
+# draws (lit pixels) x (current of one pixel at the text color) plus the idle
+# current of every LED (multicolor text is estimated at its brightest color).
+# Lit pixels come from running sums of column popcounts built once per text,
+# so each frame's estimate is O(1).
+# ---------------------------------------------------------------------------
+
+# Dimming steps used when a frame is over budget (fewer steps = fewer
+# pattern cache rebuilds in display.py as the load changes)
+LEVELS = const(16)
+
+# Stat slots (the per-frame mA sum is split into thousands + remainder so it
+# stays a small int over long uptimes)
+FRAMES = const(0)
+LIMITED = const(1)
+PEAK_MA = const(2)
+MA_SUM_K = const(3)
+MA_SUM_REM = const(4)
+_NUM_STATS = const(5)
+
+stats = array("L", [0] * _NUM_STATS)
+
+# Supply budget for the LEDs in mA (0 = estimate only, never dim)
+budget_ma = config.POWER_BUDGET_MA
+
+# Set bits in every byte value
+_POPCOUNT = bytes(bin(i).count("1") for i in range(256))
+
+_columns = None
+_prefix = array("L", [0])  # _prefix[i] = lit pixels in _columns[:i]
+_color = None
+_pixel_ua = 0  # uA drawn by one pixel lit at _color
+
+
+def reset():
+    for i in range(_NUM_STATS):
+        stats[i] = 0
+
+
+def _column_bits(word):
+    n = 0
+    while word:
+        n += _POPCOUNT[word & 0xFF]
+        word >>= 8
+    return n
+
+
+def _index(columns):
+    """Build the lit pixel running sums for a new text (the sum array only grows)."""
+    global _columns, _prefix
+    prefix = _prefix
+    if len(prefix) < len(columns) + 1:
+        prefix = array("L", [0] * (len(columns) + 1))
+    total = 0
+    for i in range(len(columns)):
+        total += _column_bits(columns[i])
+        prefix[i + 1] = total
+    _columns = columns
+    _prefix = prefix
+
+
+def forget():
+    """Drop the index after the indexed columns were changed in place."""
+    global _columns
+    _columns = None
+
+
+def lit_pixels(columns, offset, width):
+    """Number of lit pixels when columns are shown from offset on a width-column display."""
+    if columns is not _columns:
+        _index(columns)
+    a = offset if offset > 0 else 0
+    b = offset + width
+    n = len(columns)
+    if b > n:
+        b = n
+    return _prefix[b] - _prefix[a] if b > a else 0
+
+
+def limit(columns, offset, width, num_leds, color, level=LEVELS):
+    """Estimate a frame's current at color scaled to level/LEVELS.
+
+    Returns the level to draw the frame at: level, or lower if over budget.
+    """
+    global _color, _pixel_ua
+    if color != _color:
+        _color = color
+        _pixel_ua = (color[0] + color[1] + color[2]) * config.LED_MA_PER_CHANNEL * 1000 // 255
+    idle_ma = num_leds * config.LED_IDLE_MA
+    full_ua = lit_pixels(columns, offset, width) * _pixel_ua
+    load_ua = full_ua if level >= LEVELS else full_ua // LEVELS * level
+    ma = idle_ma + load_ua // 1000
+    if budget_ma and ma > budget_ma:
+        limited = 0
+        if budget_ma > idle_ma:
+            limited = min(level - 1, (budget_ma - idle_ma) * 1000 // (full_ua // LEVELS + 1))
+        level = limited
+        ma = idle_ma + full_ua // LEVELS * level // 1000
+        stats[LIMITED] += 1
+    stats[FRAMES] += 1
+    if ma > stats[PEAK_MA]:
+        stats[PEAK_MA] = ma
+    rem = stats[MA_SUM_REM] + ma
+    if rem >= 1000:
+        stats[MA_SUM_K] += rem // 1000
+        rem %= 1000
+    stats[MA_SUM_REM] = rem
+    return level
+
+
+def average_ma():
+    """Average estimated LED current per frame since boot."""
+    frames = stats[FRAMES]
+    return (stats[MA_SUM_K] * 1000 + stats[MA_SUM_REM]) // frames if frames else 0
+
+
+def report():
+    """Print estimated LED current since boot."""
+    frames = stats[FRAMES]
+    avg = average_ma()
+    print("--- power ---")
+    print("budget mA:", budget_ma or "off", " peak mA:", stats[PEAK_MA], " avg mA:", avg)
+    print("frames:", frames, " dimmed:", stats[LIMITED])
@@ -0,0 +1,231 @@
+import json
+import os
+import struct
+from binascii import crc32
+
+# ---------------------------------------------------------------------------
+# Setting Values
+# ---------------------------------------------------------------------------
+
+# Color name -> RGB tuple mapping
+COLOR_MAP = {
+    "white": (255, 255, 255),
+    "blue": (0, 0, 255),
+    "green": (0, 255, 0),
+    "yellow": (255, 255, 0),
+    "orange": (255, 128, 0),
+    "red": (255, 0, 0),
+    "pink": (255, 50, 150),
+    "purple": (128, 0, 255),
+}
+
+# Ordered list for menu display
+COLOR_NAMES = ["white", "blue", "green", "yellow", "orange", "red", "pink", "purple"]
+
+# Brightness 0-10 -> NeoPixel brightness value (0-255)
+BRIGHTNESS_MAP = [5, 10, 20, 35, 55, 80, 110, 145, 185, 220, 255]
+
+# Default settings (used when settings.json is missing or corrupt)
+DEFAULT_SETTINGS = {
+    "api_source": "recent",
+    "wifi_ssid": "",
+    "wifi_password": "",
+    "api_key": "",
+    "text_color": "white",
+    "brightness": 3,
+    "font_size": "large",
+    "font_width": "fixed",
+    "scroll_delay": 80,
+    "transition": "none",
+    "topics": [],
+    "energy_mode": "normal",
+}
+
+
+# ---------------------------------------------------------------------------
+# Crash-Safe Files
+# Every write goes to "<path>.tmp" first and is then renamed over the old
+# file, so a power cut leaves either the old or the new version. Files end
+# with a CRC32 so a damaged one is detected instead of half-read.
+# ---------------------------------------------------------------------------
+
+PATH = "settings.json"
+_TMP = ".tmp"
+_BAK = ".bak"
+
+
+def _replace(tmp, path, backup=None):
+    """Move tmp over path, keeping the previous file as backup if given."""
+    if backup:
+        try:
+            os.remove(backup)
+        except OSError:
+            pass
+        try:
+            os.rename(path, backup)
+        except OSError:
+            pass  # no previous file
+    else:
+        try:
+            os.remove(path)  # FAT cannot rename over an existing file
+        except OSError:
+            pass
+    # Until this rename the new data is only in tmp, which the loaders also try
+    os.rename(tmp, path)
+
+
+def _checksum(data):
+    return "%08x" % (crc32(data) & 0xFFFFFFFF)
+
+# ---------------------------------------------------------------------------
+# Settings Persistence
+# settings.json holds one JSON line followed by a checksum line. Files
+# written by hand (no checksum line) are still accepted. Saving keeps the
+# previous file as settings.json.bak, and loading falls back to the
+# interrupted-save temp file, then to that backup.
+# ---------------------------------------------------------------------------
+
+# Settings as last loaded or saved, so unchanged settings are not rewritten
+_committed = None
+
+
+def _decode(text):
+    """Parse settings file text. Returns a dict, or None if damaged."""
+    text = text.rstrip()
+    i = text.rfind("\n")
+    body = text
+    if i > 0:
+        tail = text[i + 1:]
+        try:
+            int(tail, 16)
+            is_checksum = len(tail) == 8
+        except ValueError:
+            is_checksum = False
+        if is_checksum:
+            body = text[:i]
+            if _checksum(body.encode()) != tail:
+                return None
+    data = json.loads(body)
+    return data if isinstance(data, dict) else None
+
+
+def load_settings():
+    """Load settings from settings.json (or its temp/backup copy). Returns defaults if none is usable."""
+    global _committed
+    for path in (PATH, PATH + _TMP, PATH + _BAK):
+        try:
+            with open(path, "r") as f:
+                text = f.read()
+        except OSError:
+            continue  # missing
+        try:
+            saved = _decode(text)
+        except ValueError:
+            saved = None
+        if saved is None:
+            print("Settings file damaged:", path)
+            continue
+        if path != PATH:
+            print("Settings restored from", path)
+        merged = dict(DEFAULT_SETTINGS)
+        for key in DEFAULT_SETTINGS:
+            if key in saved:
+                merged[key] = saved[key]
+        _committed = dict(merged)
+        return merged
+    return dict(DEFAULT_SETTINGS)
+
+
+def save_settings(settings):
+    """Atomically write settings to settings.json, unless unchanged since the last save."""
+    global _committed
+    if settings == _committed:
+        return
+    body = json.dumps(settings)
+    tmp = PATH + _TMP
+    try:
+        with open(tmp, "w") as f:
+            f.write(body + "\n" + _checksum(body.encode()) + "\n")
+        _replace(tmp, PATH, PATH + _BAK)
+        _committed = dict(settings)
+    except OSError as e:
+        print("Settings save error:", e)
+
+# ---------------------------------------------------------------------------
+# JSON State Files
+# Larger variable-size state (the fact cache) in the same checksummed
+# one-line format as settings.json, without a backup copy.
+# ---------------------------------------------------------------------------
+
+def save_json(path, data):
+    """Atomically write a dict as a checksummed JSON line. Returns True on success."""
+    body = json.dumps(data)
+    tmp = path + _TMP
+    try:
+        with open(tmp, "w") as f:
+            f.write(body + "\n" + _checksum(body.encode()) + "\n")
+        _replace(tmp, path)
+        return True
+    except OSError as e:
+        print("State save error:", path, e)
+        return False
+
+
+def load_json(path):
+    """Read a dict written by save_json (or its temp copy). Returns None if missing or damaged."""
+    for p in (path, path + _TMP):
+        try:
+            with open(p, "r") as f:
+                text = f.read()
+        except OSError:
+            continue
+        try:
+            data = _decode(text)
+        except ValueError:
+            data = None
+        if data is not None:
+            return data
+    return None
+
+# ---------------------------------------------------------------------------
+# State Blobs
+# Fixed-layout binary state (counters, caches) in preallocated buffers, one
+# file per blob, so updating it never rewrites settings.json.
+# ---------------------------------------------------------------------------
+
+def save_blob(path, buffers):
+    """Atomically write buffers (bytearrays/arrays) to path. Returns True on success."""
+    crc = 0
+    for b in buffers:
+        crc = crc32(b, crc)
+    tmp = path + _TMP
+    try:
+        with open(tmp, "wb") as f:
+            for b in buffers:
+                f.write(b)
+            f.write(struct.pack("<I", crc & 0xFFFFFFFF))
+        _replace(tmp, path)
+        return True
+    except OSError as e:
+        print("State save error:", path, e)
+        return False
+
+
+def load_blob(path, buffers):
+    """Fill preallocated buffers from a blob. Returns False if it is missing, a different size or damaged."""
+    for p in (path, path + _TMP):
+        try:
+            with open(p, "rb") as f:
+                crc = 0
+                ok = True
+                for b in buffers:
+                    if f.readinto(b) != len(bytes(b)):
+                        ok = False
+                        break
+                    crc = crc32(b, crc)
+                tail = f.read(5)
+            if ok and len(tail) == 4 and struct.unpack("<I", tail)[0] == crc & 0xFFFFFFFF:
+                return True
+        except OSError:
+            pass
+    return False
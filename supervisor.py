@@ -0,0 +1,213 @@
+import json
+import os
+import struct
+import time
+from binascii import crc32
+
+import machine
+
+import config
+import factstore
+import store
+import telemetry
+
+try:
+    from micropython import const
+except ImportError:
+    def const(x):
+        return x
+
+# ---------------------------------------------------------------------------
+# Crash Supervisor
+# The hardware watchdog resets the board when the main loop stops feeding
+# it (a hung fetch, a stuck loop). Before each fact a small resume record
+# goes to RTC memory, which survives resets but not power cuts: which fact
+# of which shuffled round is showing. After a crash or watchdog reset the
+# board reloads the fact cache from flash and carries on from the fact after
+# it, without waiting for WiFi or a fetch. The fact that was showing may be
+# what crashed, so it is skipped, and after RESUME_MAX_CRASHES crash resets
+# at the same fact the board starts fresh (connect, fetch, new round).
+# ---------------------------------------------------------------------------
+
+# Reset causes recorded for the next boot
+CAUSE_NONE = const(0)
+CAUSE_EXCEPTION = const(1)
+CAUSE_WATCHDOG = const(2)
+_CAUSE_NAMES = ("none", "exception", "watchdog")
+
+# magic, cause, settings digest, fact cache id, shuffle key, position,
+# round length, position of the last crash, crash resets there in a row,
+# cause text
+_MAGIC = b"KRS2"
+_FORMAT = "<4sHIIIHHHH48s"
+_record = bytearray(struct.calcsize(_FORMAT))
+
+# Written instead of RTC memory (on a crash only) where RTC memory is missing
+RESUME_PATH = "resume.bin"
+
+cause = CAUSE_NONE
+cause_text = ""
+
+_rtc = None
+_wdt = None
+_feeder = None
+_saved = None  # (settings digest, cache id, key, position, length) from the last boot
+_digest = 0
+_cache = 0
+_key = 0
+_position = 0
+_length = 0
+_crash_at = 0
+_crashes = 0
+
+
+def _write(code, text):
+    struct.pack_into(_FORMAT, _record, 0, _MAGIC, code, _digest, _cache, _key, _position,
+                     _length, _crash_at, _crashes, text)
+    if _rtc is not None:
+        _rtc.memory(_record)
+    elif code != CAUSE_NONE:
+        store.save_blob(RESUME_PATH, (_record,))
+
+
+def init():
+    """Read the last resume record and why the board reset (after telemetry.load)."""
+    global _rtc, cause, cause_text, _saved, _digest, _cache, _key, _position, _length
+    global _crash_at, _crashes
+    try:
+        _rtc = machine.RTC()
+        data = _rtc.memory()
+    except (AttributeError, OSError):
+        _rtc = None
+        data = b""
+    if len(data) == len(_record):
+        _record[:] = data
+    elif not store.load_blob(RESUME_PATH, (_record,)):
+        _record[0] = 0
+    try:
+        os.remove(RESUME_PATH)
+    except OSError:
+        pass
+
+    crash_at = crashes = 0
+    if _record[:4] == _MAGIC:
+        (_, code, digest, cache, key, position, length, crash_at, crashes,
+         text) = struct.unpack(_FORMAT, _record)
+        _saved = (digest, cache, key, position, length)
+        if code == CAUSE_EXCEPTION:
+            cause = CAUSE_EXCEPTION
+            try:
+                cause_text = text.rstrip(b"\0").decode()
+            except UnicodeError:
+                cause_text = "?"  # cut inside a character
+    if machine.reset_cause() == machine.WDT_RESET:
+        cause = CAUSE_WATCHDOG
+        cause_text = "watchdog timeout"
+    if _saved is not None:
+        # Keep the resume point (until the first new fact) but not the cause
+        _digest, _cache, _key, _position, _length = _saved
+        if cause:
+            # Skip the fact that was showing, unless crashes keep coming back to it
+            _crashes = crashes + 1 if crashes and crash_at == _position else 1
+            _crash_at = _position
+            if _crashes >= config.RESUME_MAX_CRASHES:
+                print("Not resuming:", _crashes, "crash resets at fact", _position + 1)
+                _saved = None
+            else:
+                _saved = (_digest, _cache, _key, _position + 1, _length)
+        _write(CAUSE_NONE, b"")
+    if cause:
+        telemetry.crash(cause == CAUSE_WATCHDOG)
+        print("Reset by", _CAUSE_NAMES[cause] + ":", cause_text)
+
+
+def _settings_digest(settings):
+    """Digest of the settings (and recently shown filter) that decide the rotation."""
+    body = json.dumps([settings.get("api_source"), settings.get("topics"),
+                       factstore.seen_epoch()])
+    return crc32(body.encode()) & 0x3FFFFFFF
+
+
+def resume_point(settings):
+    """(shuffle key, position, round length) to carry on from, or None.
+
+    Loads the fact cache when the saved record matches it and the settings.
+    """
+    if _saved is None:
+        return None
+    digest, cache, key, position, length = _saved
+    if not length or digest != _settings_digest(settings):
+        return None
+    if not factstore.load_cache() or factstore.cache_id != cache:
+        return None
+    return key, position, length
+
+
+def begin_round(settings, key, length):
+    """Note the shuffle key and length of a new round of facts."""
+    global _digest, _cache, _key, _length
+    _digest = _settings_digest(settings)
+    _cache = factstore.cache_id
+    _key = key
+    _length = length
+
+
+def at(position):
+    """Record that the fact at position of the round is showing (RTC memory only)."""
+    global _position
+    _position = position
+    _write(CAUSE_NONE, b"")
+
+
+def crash(e):
+    """Record an unhandled exception for the next boot."""
+    text = (type(e).__name__ + ": " + str(e)).encode()
+    _write(CAUSE_EXCEPTION, text[:48])
+
+
+def recovered(resumed):
+    """Call at the first frame: count and report the time since a crash reset."""
+    if not cause:
+        return
+    ms = time.ticks_ms()
+    telemetry.recovered(ms)
+    print("Recovered from", _CAUSE_NAMES[cause], "in", ms, "ms",
+          "(resumed)" if resumed else "(fresh start)")
+
+# ---------------------------------------------------------------------------
+# Watchdog
+# Fed once per frame and in every loop that waits (WiFi, fetch retries,
+# the settings menu, quiet hours). It cannot be stopped once started.
+# ---------------------------------------------------------------------------
+
+def start_watchdog():
+    """Start the hardware watchdog (config.WDT_TIMEOUT_MS, 0 = off)."""
+    global _wdt
+    if not config.WDT_TIMEOUT_MS:
+        return
+    try:
+        _wdt = machine.WDT(timeout=config.WDT_TIMEOUT_MS)
+    except (AttributeError, ValueError, OSError) as e:
+        print("Watchdog unavailable:", e)
+
+
+def feed():
+    if _wdt is not None:
+        _wdt.feed()
+
+
+def _feed_timer(_t):
+    _wdt.feed()
+
+
+def release():
+    """Keep feeding the watchdog from a timer once the app stops (Ctrl-C to the REPL)."""
+    global _feeder
+    if _wdt is None:
+        return
+    try:
+        _feeder = machine.Timer(config.WDT_TIMER_ID)
+        _feeder.init(period=config.WDT_TIMEOUT_MS // 2, mode=machine.Timer.PERIODIC,
+                     callback=_feed_timer)
+    except (ValueError, OSError) as e:
+        print("Watchdog timer unavailable:", e)
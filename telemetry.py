@@ -0,0 +1,349 @@
+import gc
+import time
+from array import array
+
+import config
+import store
+
+try:
+    from micropython import const
+except ImportError:
+    def const(x):
+        return x
+
+# ---------------------------------------------------------------------------
+# Counter Slots
+# All metrics live in two preallocated arrays so recording never allocates.
+# Microsecond totals are split into ms + remainder slots so that they stay
+# small ints (no bigint allocation) over months of uptime.
+# ---------------------------------------------------------------------------
+FRAMES = const(0)
+LATE_FRAMES = const(1)
+I2C_POLLS = const(2)
+I2C_MS_TOTAL = const(3)
+I2C_US_REM = const(4)
+I2C_US_MAX = const(5)
+HEAP_LOW = const(6)
+GC_RUNS = const(7)
+GC_MS_TOTAL = const(8)
+GC_US_REM = const(9)
+GC_US_MAX = const(10)
+FETCHES = const(11)
+FETCH_FAILS = const(12)
+FETCH_BYTES = const(13)
+FETCH_MS_TOTAL = const(14)
+FETCH_MS_MAX = const(15)
+WIFI_RECONNECTS = const(16)
+BOOTS = const(17)
+KEYS_DROPPED = const(18)
+CRASHES = const(19)
+WDT_RESETS = const(20)
+RECOVERIES = const(21)
+RECOVER_MS_TOTAL = const(22)
+RECOVER_MS_MAX = const(23)
+TLS_FULL = const(24)
+TLS_FULL_MS_TOTAL = const(25)
+TLS_FULL_HEAP_MAX = const(26)
+TLS_RESUMED = const(27)
+TLS_RESUMED_MS_TOTAL = const(28)
+TLS_RESUMED_HEAP_MAX = const(29)
+RECENT_CHECKS = const(30)
+RECENT_HITS = const(31)
+RECENT_REPEATS = const(32)
+MENU_KEYS = const(33)
+MENU_MS_TOTAL = const(34)
+MENU_MS_MAX = const(35)
+_NUM_COUNTERS = const(36)
+
+_COUNTER_NAMES = (
+    "frames", "late_frames", "i2c_polls", "i2c_ms_total", "i2c_us_rem", "i2c_us_max",
+    "heap_low", "gc_runs", "gc_ms_total", "gc_us_rem", "gc_us_max", "fetches",
+    "fetch_fails", "fetch_bytes", "fetch_ms_total", "fetch_ms_max",
+    "wifi_reconnects", "boots", "keys_dropped", "crashes", "wdt_resets", "recoveries",
+    "recover_ms_total", "recover_ms_max", "tls_full", "tls_full_ms_total",
+    "tls_full_heap_max", "tls_resumed", "tls_resumed_ms_total", "tls_resumed_heap_max",
+    "recent_checks", "recent_hits", "recent_repeats", "menu_keys", "menu_ms_total",
+    "menu_ms_max",
+)
+
+# Frame render time histogram: upper bound of each bucket in microseconds.
+# The final slot counts everything slower than the last bound.
+FRAME_BUCKETS_US = (1000, 2000, 4000, 8000, 16000, 32000, 64000)
+_NUM_BUCKETS = const(8)
+
+# A frame is late when its period exceeds the target delay by this percentage
+LATE_SLACK_PCT = 25
+
+PATH = "telemetry.bin"
+
+# Boot phases, marked in order from power-on to the first scrolled frame
+BOOT_MAIN = const(0)
+BOOT_IMPORTS = const(1)
+BOOT_PERIPHERALS = const(2)
+BOOT_WIFI = const(3)
+BOOT_FETCH = const(4)
+BOOT_FIRST_FRAME = const(5)
+_NUM_BOOT_PHASES = const(6)
+_BOOT_PHASE_NAMES = ("start main.py", "imports", "peripherals", "wifi", "fetch", "first frame")
+
+counters = array("L", [0] * _NUM_COUNTERS)
+frame_hist = array("L", [0] * _NUM_BUCKETS)
+_bounds = array("L", FRAME_BUCKETS_US)
+
+# ms since power-on and heap in use when each boot phase completed
+boot_ms = array("L", [0] * _NUM_BOOT_PHASES)
+boot_heap = array("L", [0] * _NUM_BOOT_PHASES)
+boot_complete = False
+
+_last_frame_us = 0
+
+
+def reset():
+    """Clear all counters and the histogram."""
+    global _last_frame_us
+    for i in range(_NUM_COUNTERS):
+        counters[i] = 0
+    for i in range(_NUM_BUCKETS):
+        frame_hist[i] = 0
+    _last_frame_us = 0
+
+
+reset()
+
+# ---------------------------------------------------------------------------
+# Boot Profiling
+# ticks_ms() starts at zero on reset, so marks are measured from power-on.
+# ---------------------------------------------------------------------------
+
+def boot_mark(phase):
+    """Record the time and heap in use at the end of a boot phase."""
+    global boot_complete
+    boot_ms[phase] = time.ticks_ms()
+    boot_heap[phase] = gc.mem_alloc()
+    if phase == BOOT_FIRST_FRAME:
+        boot_complete = True
+
+
+def boot_report():
+    """Print the duration of each boot phase and the heap in use after it."""
+    print("--- boot ---")
+    previous = 0
+    for i in range(_NUM_BOOT_PHASES):
+        if boot_ms[i]:
+            print(" ", _BOOT_PHASE_NAMES[i] + ":", boot_ms[i] - previous, "ms,",
+                  "heap used", boot_heap[i])
+            previous = boot_ms[i]
+    print("  time to first frame:", boot_ms[BOOT_FIRST_FRAME], "ms")
+
+# ---------------------------------------------------------------------------
+# Recording (allocation-free)
+# ---------------------------------------------------------------------------
+
+def frame(start_us, render_us, delay_ms):
+    """Record one rendered frame: render start (ticks_us), render time and target delay."""
+    global _last_frame_us
+    counters[FRAMES] += 1
+    i = 0
+    while i < _NUM_BUCKETS - 1 and render_us > _bounds[i]:
+        i += 1
+    frame_hist[i] += 1
+    if _last_frame_us:
+        period = time.ticks_diff(start_us, _last_frame_us)
+        if period > delay_ms * (1000 + LATE_SLACK_PCT * 10):
+            counters[LATE_FRAMES] += 1
+    _last_frame_us = start_us
+
+
+def frames_paused():
+    """Mark a break in the frame stream so the next frame is not counted late."""
+    global _last_frame_us
+    _last_frame_us = 0
+
+
+def _add_us(ms_slot, us):
+    rem = counters[ms_slot + 1] + us
+    if rem >= 1000:
+        counters[ms_slot] += rem // 1000
+        rem %= 1000
+    counters[ms_slot + 1] = rem
+
+
+def i2c_poll(us):
+    counters[I2C_POLLS] += 1
+    _add_us(I2C_MS_TOTAL, us)
+    if us > counters[I2C_US_MAX]:
+        counters[I2C_US_MAX] = us
+
+
+def heap():
+    """Sample free heap and update the low-water mark (0 = not yet sampled)."""
+    free = gc.mem_free()
+    low = counters[HEAP_LOW]
+    if low == 0 or free < low:
+        counters[HEAP_LOW] = free
+
+
+def collect():
+    """Run gc.collect() and record the pause duration. Returns the pause in us."""
+    start = time.ticks_us()
+    gc.collect()
+    us = time.ticks_diff(time.ticks_us(), start)
+    counters[GC_RUNS] += 1
+    _add_us(GC_MS_TOTAL, us)
+    if us > counters[GC_US_MAX]:
+        counters[GC_US_MAX] = us
+    return us
+
+# ---------------------------------------------------------------------------
+# GC Policy
+# The scroll loop allocates nothing per frame, so the heap only shrinks at
+# fact boundaries and fetches. Collections run between facts when free heap
+# drops (or by the next boundary would drop, see planner.py) below the
+# headroom, with gc.threshold as a backstop.
+# ---------------------------------------------------------------------------
+
+def gc_init():
+    """Make MicroPython also collect after GC_THRESHOLD_KB of new allocations."""
+    try:
+        gc.threshold(config.GC_THRESHOLD_KB * 1024)
+    except AttributeError:
+        pass
+
+
+def collect_if_low(reserve=0):
+    """Collect only when free heap less reserve is below GC_HEADROOM_KB, logging the pause.
+
+    Returns True if run.
+    """
+    free = gc.mem_free()
+    if free - reserve >= config.GC_HEADROOM_KB * 1024:
+        return False
+    us = collect()
+    print("GC:", us, "us, free", free, "->", gc.mem_free())
+    return True
+
+
+def fetch(ok, nbytes, ms):
+    """Record one API fetch attempt: success, response size and latency."""
+    counters[FETCHES] += 1
+    if not ok:
+        counters[FETCH_FAILS] += 1
+    counters[FETCH_BYTES] += nbytes
+    counters[FETCH_MS_TOTAL] += ms
+    if ms > counters[FETCH_MS_MAX]:
+        counters[FETCH_MS_MAX] = ms
+
+
+def handshake(resumed, ms, heap):
+    """Record one TLS handshake (full or resumed): its time and the heap it took."""
+    slot = TLS_RESUMED if resumed else TLS_FULL
+    counters[slot] += 1
+    counters[slot + 1] += ms
+    if heap > counters[slot + 2]:
+        counters[slot + 2] = heap
+
+
+def recent_checked(checked, hits):
+    """Record a round ordered by the recently shown filter: facts checked, found shown."""
+    counters[RECENT_CHECKS] += checked
+    counters[RECENT_HITS] += hits
+
+
+def recent_repeat():
+    """Count a fact shown again within the recently shown window."""
+    counters[RECENT_REPEATS] += 1
+
+
+def menu_key(ms):
+    """Record the time from a key press to the OLED showing the menu's response."""
+    counters[MENU_KEYS] += 1
+    counters[MENU_MS_TOTAL] += ms
+    if ms > counters[MENU_MS_MAX]:
+        counters[MENU_MS_MAX] = ms
+
+
+def wifi_reconnect():
+    counters[WIFI_RECONNECTS] += 1
+
+
+def key_dropped():
+    counters[KEYS_DROPPED] += 1
+
+
+def crash(watchdog):
+    """Count a reset caused by an unhandled exception or the watchdog."""
+    counters[CRASHES] += 1
+    if watchdog:
+        counters[WDT_RESETS] += 1
+
+
+def recovered(ms):
+    """Record the time from a crash reset to the first frame."""
+    counters[RECOVERIES] += 1
+    counters[RECOVER_MS_TOTAL] += ms
+    if ms > counters[RECOVER_MS_MAX]:
+        counters[RECOVER_MS_MAX] = ms
+
+# ---------------------------------------------------------------------------
+# Reporting and Persistence
+# ---------------------------------------------------------------------------
+
+def _avg(total, count):
+    return total // count if count else 0
+
+
+def _avg_us(ms_slot, count):
+    return _avg(counters[ms_slot] * 1000 + counters[ms_slot + 1], count)
+
+
+def dump():
+    """Print a human-readable summary over serial."""
+    c = counters
+    print("--- telemetry ---")
+    print("boots:", c[BOOTS], " wifi reconnects:", c[WIFI_RECONNECTS])
+    print("crashes:", c[CRASHES], " watchdog:", c[WDT_RESETS], " recover avg ms:",
+          _avg(c[RECOVER_MS_TOTAL], c[RECOVERIES]), " max ms:", c[RECOVER_MS_MAX])
+    print("frames:", c[FRAMES], " late:", c[LATE_FRAMES])
+    lower = 0
+    for i in range(_NUM_BUCKETS):
+        if i < _NUM_BUCKETS - 1:
+            label = str(lower // 1000) + "-" + str(_bounds[i] // 1000) + "ms"
+            lower = _bounds[i]
+        else:
+            label = ">" + str(lower // 1000) + "ms"
+        print("  render", label, frame_hist[i])
+    print("i2c polls:", c[I2C_POLLS], " avg us:", _avg_us(I2C_MS_TOTAL, c[I2C_POLLS]),
+          " max us:", c[I2C_US_MAX], " keys dropped:", c[KEYS_DROPPED])
+    print("menu keys:", c[MENU_KEYS], " key to OLED avg ms:", _avg(c[MENU_MS_TOTAL], c[MENU_KEYS]),
+          " max ms:", c[MENU_MS_MAX])
+    print("heap free now:", gc.mem_free(), " low:", c[HEAP_LOW] or "-")
+    print("gc runs:", c[GC_RUNS], " avg us:", _avg_us(GC_MS_TOTAL, c[GC_RUNS]),
+          " max us:", c[GC_US_MAX])
+    print("fetches:", c[FETCHES], " failed:", c[FETCH_FAILS], " bytes:", c[FETCH_BYTES],
+          " avg ms:", _avg(c[FETCH_MS_TOTAL], c[FETCHES]), " max ms:", c[FETCH_MS_MAX])
+    print("tls full:", c[TLS_FULL], " avg ms:", _avg(c[TLS_FULL_MS_TOTAL], c[TLS_FULL]),
+          " max heap:", c[TLS_FULL_HEAP_MAX], " resumed:", c[TLS_RESUMED], " avg ms:",
+          _avg(c[TLS_RESUMED_MS_TOTAL], c[TLS_RESUMED]), " max heap:", c[TLS_RESUMED_HEAP_MAX])
+    if boot_complete:
+        boot_report()
+
+
+def as_dict():
+    """Return counters as a dict (allocates; for reporting only)."""
+    d = {}
+    for i in range(_NUM_COUNTERS):
+        d[_COUNTER_NAMES[i]] = counters[i]
+    d["frame_hist"] = list(frame_hist)
+    return d
+
+
+def save(path=PATH):
+    """Persist counters to flash so they survive a reset."""
+    store.save_blob(path, (counters, frame_hist))
+
+
+def load(path=PATH):
+    """Restore counters saved by a previous boot and count this boot."""
+    if not store.load_blob(path, (counters, frame_hist)):
+        reset()  # none saved, damaged, or saved by a different firmware layout
+    counters[BOOTS] += 1
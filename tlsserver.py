@@ -0,0 +1,54 @@
+"""Local HTTPS test server for bench tls (run on a computer, not the board).
+
+Serves a small fact list to every GET and logs whether each TLS session was
+resumed. Make a self-signed certificate once:
+
+    openssl req -x509 -newkey rsa:2048 -nodes -keyout key.pem -out cert.pem \\
+        -days 365 -subj /CN=kibble-test
+    python3 tlsserver.py cert.pem key.pem 8443
+
+then set TLS_BENCH_URL = "https://<computer ip>:8443/" in config.py and run
+bench tls on the board console.
+"""
+import json
+import ssl
+import sys
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+FACTS = {"topics": [
+    {"topic_id": 1, "topic_name": "Science",
+     "facts": [{"content": "The speed of light is approximately 299,792 km/s"}]},
+    {"topic_id": 2, "topic_name": "Animals",
+     "facts": [{"content": "Octopuses have three hearts"}]},
+]}
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = json.dumps(FACTS).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        print(self.client_address[0], self.request.version(),
+              "resumed" if self.request.session_reused else "full handshake")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(cert, key, port=8443):
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    server = HTTPServer(("", port), Handler)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    print("Serving on port", port)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("usage: python3 tlsserver.py cert.pem key.pem [port]")
+        sys.exit(1)
+    serve(sys.argv[1], sys.argv[2], int(sys.argv[3]) if len(sys.argv) > 3 else 8443)
@@ -0,0 +1,339 @@
+import socket
+import struct
+import time
+from array import array
+
+import config
+
+try:
+    from micropython import const
+except ImportError:
+    def const(x):
+        return x
+
+try:
+    from time import ticks_ms, ticks_add, ticks_diff, sleep_ms
+except ImportError:
+    # CPython (wallsim.py): MicroPython-style wrapping ms ticks
+    _PERIOD = 1 << 30
+
+    def ticks_ms():
+        return int(time.monotonic() * 1000) % _PERIOD
+
+    def ticks_add(ticks, delta):
+        return (ticks + delta) % _PERIOD
+
+    def ticks_diff(a, b):
+        return (a - b + _PERIOD // 2) % _PERIOD - _PERIOD // 2
+
+    def sleep_ms(ms):
+        time.sleep(ms / 1000)
+
+# ---------------------------------------------------------------------------
+# Wall Mode
+# Several boards side by side scroll one virtual display. The leader fetches
+# and shuffles facts as usual and publishes each one over UDP with a scroll
+# epoch: frame k of the fact is due at epoch + k * delay on the leader's
+# clock. Every board draws frame k as the window of the virtual stream at
+# its own position. Followers keep an estimate of the leader's clock from
+# periodic sync requests (the sample with the shortest round trip wins) and
+# report how late their frames were, so the leader can report the skew.
+# ---------------------------------------------------------------------------
+
+STANDALONE = const(0)
+LEADER = const(1)
+FOLLOWER = const(2)
+_ROLES = {"leader": LEADER, "follower": FOLLOWER}
+
+# follower -> leader: magic, board index, follower ticks, frame lateness of
+# the last interval (avg, max), current round trip
+_REQUEST = "<4sBIhhH"
+_REQUEST_MAGIC = b"KWQ1"
+# leader -> follower: magic, reply?, echoed follower ticks, leader ticks,
+# fact sequence number, fact epoch, scroll delay, frame count; then the text
+_FACT = "<4sBIIIIHH"
+_FACT_MAGIC = b"KWF1"
+_FACT_SIZE = struct.calcsize(_FACT)
+MAX_TEXT = 1024
+
+# Clock samples kept; the offset comes from the one with the shortest round trip
+_NUM_SAMPLES = const(8)
+
+POLL_MS = 5  # Longest sleep while waiting for a frame
+
+role = _ROLES.get(config.WALL_ROLE, STANDALONE)
+_index = config.WALL_INDEX
+_width = 0
+_sock = None
+_leader_addr = None
+
+# Current fact (published by the leader, received by followers)
+fact_seq = 0
+fact_epoch = 0
+fact_delay = 0
+fact_frames = 0
+fact_text = None
+
+# Follower clock estimate: leader ticks = local ticks + offset
+offset = 0
+rtt = 0
+syncs = 0
+_offsets = array("l", [0] * _NUM_SAMPLES)
+_rtts = array("L", [0xFFFF] * _NUM_SAMPLES)
+_next_sync = 0
+
+# Frame lateness against the schedule (ms): this interval, the last one, and since boot
+_late_sum = 0
+_late_count = 0
+_late_peak = 0
+last_late_avg = 0
+last_late_max = 0
+_interval_end = 0
+frames = 0
+frames_skipped = 0
+late_max = 0
+
+# Leader: what each board reported last (indexed by board)
+_boards = config.WALL_BOARDS
+_addrs = [None] * _boards
+_board_avg = array("h", [0] * _boards)
+_board_max = array("h", [0] * _boards)
+_board_rtt = array("H", [0] * _boards)
+_board_seen = array("L", [0] * _boards)
+
+
+def init(width):
+    """Set one board's column count (at boot; the socket opens in start())."""
+    global _width
+    if role == STANDALONE:
+        return
+    _width = width
+    print("Wall", "leader" if role == LEADER else "follower", "board", _index + 1, "of", _boards)
+
+
+def start():
+    """Open the wall socket once WiFi is up (later calls do nothing).
+
+    Until then the leader scrolls on its own and poll() does nothing.
+    """
+    global _sock, _leader_addr, _next_sync, _interval_end
+    if role == STANDALONE or _sock is not None:
+        return
+    _sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    if role == LEADER:
+        _sock.bind(("0.0.0.0", config.WALL_PORT))
+    else:
+        _sock.bind(("0.0.0.0", 0))
+        _leader_addr = socket.getaddrinfo(config.WALL_LEADER, config.WALL_PORT)[0][-1]
+    _sock.setblocking(False)
+    _next_sync = ticks_ms()
+    _interval_end = ticks_add(ticks_ms(), config.WALL_SYNC_MS)
+
+
+def leader_ms():
+    """Now on the leader's clock."""
+    return ticks_add(ticks_ms(), offset)
+
+
+def ready():
+    """True once this board can follow the schedule (a follower needs one clock sync)."""
+    return role != FOLLOWER or syncs > 0
+
+# ---------------------------------------------------------------------------
+# Messages
+# ---------------------------------------------------------------------------
+
+def _fact_packet(reply, echo):
+    head = struct.pack(_FACT, _FACT_MAGIC, reply, echo, ticks_ms(), fact_seq, fact_epoch,
+                       fact_delay, fact_frames)
+    return head + (fact_text or b"")
+
+
+def _on_request(data, addr):
+    magic, index, t1, avg, peak, board_rtt = struct.unpack(_REQUEST, data[:struct.calcsize(_REQUEST)])
+    if magic != _REQUEST_MAGIC or index >= _boards:
+        return
+    _addrs[index] = addr
+    _board_avg[index] = avg
+    _board_max[index] = peak
+    _board_rtt[index] = board_rtt
+    _board_seen[index] = ticks_ms()
+    try:
+        _sock.sendto(_fact_packet(1, t1), addr)
+    except OSError:
+        pass
+
+
+def _on_fact(data):
+    global fact_seq, fact_epoch, fact_delay, fact_frames, fact_text, offset, rtt, syncs
+    if len(data) < _FACT_SIZE:
+        return
+    magic, reply, t1, leader_now, seq, epoch, delay, count = struct.unpack(_FACT, data[:_FACT_SIZE])
+    if magic != _FACT_MAGIC:
+        return
+    if reply:
+        # Round trip t1 -> t3; the leader stamped leader_now about halfway
+        t3 = ticks_ms()
+        sample_rtt = ticks_diff(t3, t1)
+        i = syncs % _NUM_SAMPLES
+        _offsets[i] = ticks_diff(leader_now, t1) - sample_rtt // 2
+        _rtts[i] = sample_rtt
+        syncs += 1
+        best = 0
+        for j in range(1, _NUM_SAMPLES):
+            if _rtts[j] < _rtts[best]:
+                best = j
+        offset = _offsets[best]
+        rtt = _rtts[best]
+    if seq and (seq != fact_seq or fact_text is None):  # 0 = nothing published yet
+        fact_seq = seq
+        fact_epoch = epoch
+        fact_delay = delay
+        fact_frames = count
+        fact_text = bytes(data[_FACT_SIZE:])
+
+
+def _roll_interval():
+    """Every WALL_SYNC_MS, keep the lateness of the interval that just ended."""
+    global _late_sum, _late_count, _late_peak, last_late_avg, last_late_max, _interval_end
+    now = ticks_ms()
+    if ticks_diff(now, _interval_end) < 0:
+        return
+    _interval_end = ticks_add(now, config.WALL_SYNC_MS)
+    last_late_avg = _late_sum // _late_count if _late_count else 0
+    last_late_max = _late_peak
+    _late_sum = 0
+    _late_count = 0
+    _late_peak = 0
+
+
+def poll():
+    """Handle waiting datagrams, and send a sync request when one is due (followers)."""
+    global _next_sync
+    if _sock is None:
+        return
+    while True:
+        try:
+            data, addr = _sock.recvfrom(_FACT_SIZE + MAX_TEXT)
+        except OSError:
+            break
+        if role == LEADER:
+            _on_request(data, addr)
+        else:
+            _on_fact(data)
+    _roll_interval()
+    if role == FOLLOWER and ticks_diff(ticks_ms(), _next_sync) >= 0:
+        # Sync quickly until the sample window is full
+        period = config.WALL_SYNC_MS if syncs >= _NUM_SAMPLES else config.WALL_SYNC_MS // 8
+        _next_sync = ticks_add(ticks_ms(), period)
+        request = struct.pack(_REQUEST, _REQUEST_MAGIC, _index, ticks_ms(),
+                              max(-32768, min(32767, last_late_avg)),
+                              max(-32768, min(32767, last_late_max)), min(rtt, 0xFFFF))
+        try:
+            _sock.sendto(request, _leader_addr)
+        except OSError:
+            pass
+
+# ---------------------------------------------------------------------------
+# Scrolling
+# ---------------------------------------------------------------------------
+
+def frame_count(columns):
+    """Frames of a fact of columns columns: in from the right of the wall, out at the left."""
+    return columns + _boards * _width
+
+
+def publish(text, columns, delay):
+    """Leader: start a fact of columns columns on every board. Returns its frame count."""
+    global fact_seq, fact_epoch, fact_delay, fact_frames, fact_text
+    data = text.encode() if isinstance(text, str) else text
+    fact_seq += 1
+    fact_epoch = ticks_add(ticks_ms(), config.WALL_LEAD_MS)
+    fact_delay = delay
+    fact_frames = frame_count(columns)
+    fact_text = data[:MAX_TEXT]
+    packet = _fact_packet(0, 0)
+    for addr in _addrs:
+        if addr is not None:
+            try:
+                _sock.sendto(packet, addr)
+            except OSError:
+                pass
+    return fact_frames
+
+
+def _wait_until(due):
+    while True:
+        poll()
+        left = ticks_diff(due, leader_ms())
+        if left <= 0:
+            return
+        sleep_ms(min(left, POLL_MS))
+
+
+def play(columns, frame_fn):
+    """Scroll the current fact's columns across the wall on the shared schedule.
+
+    frame_fn(columns, offset) draws this board's window at offset and returns
+    True if a key was pressed. Frames already past due are skipped to catch
+    up. Returns True on a key, False at the end of the fact, or None when
+    the leader has moved on to a newer fact.
+    """
+    global _late_sum, _late_count, _late_peak, frames, frames_skipped, late_max
+    seq = fact_seq
+    epoch = fact_epoch
+    delay = fact_delay
+    count = fact_frames
+    first = _index * _width - _boards * _width
+    k = 0
+    while k < count:
+        due = ticks_add(epoch, k * delay)
+        _wait_until(due)
+        if fact_seq != seq:
+            return None
+        late = ticks_diff(leader_ms(), due)
+        if late >= delay:
+            skip = late // delay
+            k += skip
+            frames_skipped += skip
+            late -= skip * delay
+            if k >= count:
+                break
+        _late_sum += late
+        _late_count += 1
+        if late > _late_peak:
+            _late_peak = late
+        if late > late_max:
+            late_max = late
+        frames += 1
+        if frame_fn(columns, first + k):
+            return True
+        k += 1
+    return False
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+
+def report():
+    """Print sync and skew figures over serial."""
+    if role == STANDALONE:
+        print("Wall mode off")
+        return
+    print("--- wall ---")
+    print("role:", "leader" if role == LEADER else "follower", " board", _index + 1, "of", _boards,
+          " fact:", fact_seq)
+    print("frames:", frames, " skipped:", frames_skipped, " late avg ms:", last_late_avg,
+          " max ms:", last_late_max, " worst ms:", late_max)
+    if role == FOLLOWER:
+        print("clock offset ms:", offset, " rtt ms:", rtt, " syncs:", syncs)
+        return
+    now = ticks_ms()
+    for i in range(_boards):
+        if _addrs[i] is None:
+            continue
+        # Skew against this board: the difference in lateness against the
+        # shared schedule, give or take half the follower's clock round trip
+        print("  board", i + 1, "skew avg ms:", _board_avg[i] - last_late_avg,
+              " max ms:", _board_max[i] - last_late_avg, " +/-", _board_rtt[i] // 2,
+              " seen", ticks_diff(now, _board_seen[i]) // 1000, "s ago")
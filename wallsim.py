@@ -0,0 +1,105 @@
+"""Simulate a wall of boards on localhost to check wall.py sync (run on a computer).
+
+    python3 wallsim.py [boards] [seconds]
+
+Starts one process per board: board 1 leads, the others follow with their
+clocks deliberately offset. Each process runs the real wall.py protocol and
+scheduler, but instead of drawing it notes the host time of every frame.
+The host clock is shared by all processes, so comparing the times of the
+same frame gives the true inter-board skew. It is printed next to each
+board's own report (what the console's wall command shows on real boards).
+"""
+import json
+import subprocess
+import sys
+import time
+
+import config
+
+WIDTH = 32
+DELAY_MS = 20
+PORT = 42100
+FACTS = (
+    "Octopuses have three hearts",
+    "Honey never spoils",
+    "Light travels at 299,792 km/s",
+)
+# Clock offset of each follower against the leader, to show that sync works
+CLOCK_STEP_MS = 1234
+
+
+def _board(index, boards, seconds):
+    config.WALL_ROLE = "leader" if index == 0 else "follower"
+    config.WALL_INDEX = index
+    config.WALL_BOARDS = boards
+    config.WALL_LEADER = "127.0.0.1"
+    config.WALL_PORT = PORT
+    config.WALL_SYNC_MS = 500
+    import wall
+
+    skew = index * CLOCK_STEP_MS
+    ticks = wall.ticks_ms
+    wall.ticks_ms = lambda: wall.ticks_add(ticks(), skew)
+    wall.init(WIDTH)
+    wall.start()
+    first = index * WIDTH - boards * WIDTH
+    times = {}
+
+    def frame(columns, offset):
+        times[str(wall.fact_seq) + ":" + str(offset - first)] = time.time()
+        return False
+
+    end = time.time() + seconds
+    n = 0
+    shown = 0
+    while time.time() < end:
+        if index == 0:
+            text = FACTS[n % len(FACTS)]
+            n += 1
+            wall.publish(text, len(text) * 6, DELAY_MS)
+            wall.play(None, frame)
+        else:
+            wall.poll()
+            if wall.ready() and wall.fact_seq != shown:
+                shown = wall.fact_seq
+                wall.play(None, frame)
+            else:
+                wall.sleep_ms(wall.POLL_MS)
+    wall.report()
+    print("TIMES " + json.dumps(times))
+
+
+def main(boards=3, seconds=8):
+    procs = []
+    for index in range(boards - 1, -1, -1):  # followers first, the leader last
+        procs.append(subprocess.Popen(
+            [sys.executable, __file__, "--board", str(index), str(boards), str(seconds)],
+            stdout=subprocess.PIPE, universal_newlines=True))
+        time.sleep(0.2)
+    outputs = [p.communicate()[0] for p in procs][::-1]
+
+    times = []
+    for index in range(boards):
+        print("=== board", index + 1, "===")
+        for line in outputs[index].splitlines():
+            if line.startswith("TIMES "):
+                times.append(json.loads(line[6:]))
+            else:
+                print(line)
+
+    print("=== measured skew against the leader (host clock) ===")
+    for index in range(1, boards):
+        diffs = [(times[index][k] - times[0][k]) * 1000 for k in times[index] if k in times[0]]
+        if not diffs:
+            print("board", index + 1, ": no frames in common")
+            continue
+        print("board", index + 1, ":", len(diffs), "frames, avg",
+              round(sum(diffs) / len(diffs), 1), "ms, max",
+              round(max(abs(d) for d in diffs), 1), "ms")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--board":
+        _board(int(sys.argv[2]), int(sys.argv[3]), float(sys.argv[4]))
+    else:
+        main(*[int(a) for a in sys.argv[1:3]])